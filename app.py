@@ -1,24 +1,47 @@
+import io
 from typing import Callable
 
+from rich.console import Console
 from rich.text import TextType
-from textual import work
+from textual import on, work
 from textual.app import App, ComposeResult
 from textual.containers import Vertical, VerticalScroll
 from textual.message import Message
+from textual.screen import Screen
 from textual.widget import Widget
-from textual.widgets import Static, RichLog, TabPane, TabbedContent, Header, LoadingIndicator
+from textual.widgets import Button, Static, TabPane, TabbedContent, Header, LoadingIndicator
+from textual.worker import Worker, get_current_worker
 
+from textual_prusa_connect.alerts import DEFAULT_RULES, Alert, AlertEngine
+from textual_prusa_connect.app_log import AppLog, JsonlFileSink
+from textual_prusa_connect.bgcode import LayerIndexStore
+from textual_prusa_connect.cache import JobCache
+from textual_prusa_connect.commands import CANCEL_PRINTER_READY, SET_PRINTER_READY, CommandReport, dispatch_command
 from textual_prusa_connect.config import AppSettings
-from textual_prusa_connect.connect_api import PrusaConnectAPI
+from textual_prusa_connect.connect_api import ApiError, PrusaConnectAPI
+from textual_prusa_connect.export import iter_job_pages
+from textual_prusa_connect.telemetry import TelemetryArchive
+from textual_prusa_connect.timeline import build_timelines
+from textual_prusa_connect.transport import TRANSPORT_ERRORS
+from textual_prusa_connect.upload import UploadState
 from textual_prusa_connect.app_widgets import PrinterHeader
 from textual_prusa_connect.messages import PrinterUpdated
+from textual_prusa_connect.models import Job, Printer
+from textual_prusa_connect.widgets.camera import CameraView
 from textual_prusa_connect.widgets.dashboard import DashboardPane
 from textual_prusa_connect.widgets.file import PrintJobWidget
+from textual_prusa_connect.widgets.fleet import FleetScreen, FleetTable
+from textual_prusa_connect.widgets.log import LogView
+from textual_prusa_connect.widgets.telemetry import TelemetryPane
+from textual_prusa_connect.widgets.timeline import TimelineView
+from textual_prusa_connect.widgets.upload import UploadScreen
 
 SETTINGS = AppSettings()
 PRINTING_REFRESH = 5
 MAIN_REFRESH = 30
 OTHER_REFRESH = 30
+IDLE_PREFETCH_DELAY = 3
+COMMAND_TIMEOUT = 60
 
 dummy = {
     'filament': {},
@@ -47,9 +70,12 @@ class LazyTabPane(TabPane):
     # reference https://gist.github.com/paulrobello/0a2f807ddd195c42f87cec9ff5825ac8
     loaded = False
 
-    def __init__(self, title: TextType, init_callable: Callable, *children: Widget):
+    def __init__(self, title: TextType, init_callable: Callable, *children: Widget, prefetch: bool = True):
         super().__init__(title, *children)
         self.init_callable = init_callable
+        # expensive tabs are only loaded once visited
+        self.prefetch = prefetch
+        self.worker: Worker | None = None
 
     def compose(self) -> ComposeResult:
         yield VerticalScroll()
@@ -57,13 +83,28 @@ class LazyTabPane(TabPane):
         # to the pane does not work, while "clicking" on the pane works as expected
         yield LoadingIndicator()
 
-    @work
-    async def update_data(self):
+    @property
+    def is_loading(self) -> bool:
+        return self.worker is not None and not self.worker.is_finished
+
+    def load(self):
+        # a running load cannot be interrupted (blocking network calls), reuse it
+        if self.loaded or self.is_loading:
+            return
+        self.worker = self.update_data()
+
+    @work(thread=True, group='lazy-tab')
+    def update_data(self):
+        # init_callable is blocking (network), keep it off the event loop
         content = self.init_callable()
-        self.post_message(DataLoaded(content=content))
+        if not get_current_worker().is_cancelled:
+            self.post_message(DataLoaded(content=content))
 
     async def on_data_loaded(self, msg: DataLoaded) -> None:
         msg.stop()
+        if self.loaded:
+            return
+        self.loaded = True
         await self.query_one(LoadingIndicator).remove()
         vs = self.query_one(VerticalScroll)
         for i, element in enumerate(msg.content):
@@ -72,10 +113,7 @@ class LazyTabPane(TabPane):
                 await vs.mount(Static(" "))
 
     def on_show(self):
-        if self.loaded:
-            return
-        self.update_data()
-        self.loaded = True
+        self.load()
 
 
 class PrusaConnectApp(App):
@@ -93,16 +131,25 @@ class PrusaConnectApp(App):
     BINDINGS = [('p', 'toggle_refresh', 'Pause'),
                 ('s', 'screenshot', 'Take screenshot'),
                 ('q', 'quit', 'Quit'),
-                ('d', 'dump', 'Dump tree')]
+                ('d', 'dump', 'Dump tree'),
+                ('t', 'transport_stats', 'Transport stats'),
+                ('u', 'upload', 'Upload file'),
+                ('f', 'fleet', 'Fleet')]
     CSS_PATH = "css.tcss"
     do_refresh = True
     refresh_rate = PRINTING_REFRESH
 
     def __init__(self, headers: dict[str, str]):
         super().__init__()
+        self.app_log = AppLog(level=SETTINGS.log_level, sinks=[JsonlFileSink(SETTINGS.cache_dir / 'app.log.jsonl')])
         self.refresh_timer = None
-        self.client = PrusaConnectAPI(headers)
+        self.prefetch_timer = None
+        self.client = PrusaConnectAPI(headers, job_cache=JobCache(SETTINGS.cache_dir / 'jobs'),
+                                      base_url=SETTINGS.base_url)
+        self.layer_store = LayerIndexStore(self.client, SETTINGS.cache_dir / 'layers')
+        self.telemetry = TelemetryArchive(SETTINGS.cache_dir / 'telemetry')
         self.printer = self.client.get_printer(SETTINGS.printer_uuid)
+        self.alerts = AlertEngine(DEFAULT_RULES, sinks=[self.notify_alert])
         # self.printer = Printer(**dummy)
 
     def compose(self) -> ComposeResult:
@@ -117,20 +164,36 @@ class PrusaConnectApp(App):
 
                 def load_print_history():
                     jobs = self.client.get_jobs(limit=25)
-                    return [PrintJobWidget(job) for job in jobs]
+                    # finished jobs come from the job cache, only new or running ones cost a request
+                    details = self.client.get_jobs_details([job.id for job in jobs])
+                    return [PrintJobWidget(detail if isinstance(detail, Job) else job)
+                            for job, detail in zip(jobs, details.values())]
                 yield LazyTabPane("Print history", load_print_history)
 
+                def load_cameras():
+                    cameras = self.client.get_cameras(self.printer.uuid.get_secret_value())
+                    return [CameraView(self.client, camera, self.printer) for camera in cameras]
+                yield LazyTabPane("Cameras", load_cameras)
+
                 yield TabPane("Control", disabled=True)
-                yield TabPane("Statistics", disabled=True)
-                yield TabPane("Telemetry", disabled=True)
+                def load_statistics():
+                    timelines = build_timelines(job for page in iter_job_pages(self.client) for job in page)
+                    names = {printer.uuid.get_secret_value(): printer.name for printer in self.client.get_printers() or []}
+                    return [TimelineView(timelines, names, SETTINGS.maintenance_windows)]
+                # downloads the whole job history, never prefetched
+                yield LazyTabPane("Statistics", load_statistics, prefetch=False)
+                yield TelemetryPane(self.telemetry, self.printer)
                 yield TabPane("Settings", disabled=True)
                 with TabPane("App logs", id='logs'):
-                    yield RichLog()
+                    yield LogView(self.app_log)
 
     def on_mount(self):
         self.screen.set_focus(None)
         # self.update_printer(True)
-        self.query_one(RichLog).write(self.printer)
+        self.app_log.info('printer loaded', name=self.printer.name, state=self.printer.printer_state)
+        self.app_log.debug(repr(self.printer))
+        self.alerts.evaluate(self.printer.uuid.get_secret_value(), self.printer)
+        self.telemetry.append(self.printer.uuid.get_secret_value(), self.printer)
         self.refresh_timer = self.set_interval(self.refresh_rate, self.update_printer)
         self.set_interval(MAIN_REFRESH, self.background_loop)
 
@@ -141,9 +204,42 @@ class PrusaConnectApp(App):
         if new_rate != self.refresh_rate:
             self.refresh_rate = new_rate
             self.refresh_timer.stop()
-            self.query_one(RichLog).write(f'new rate {self.refresh_rate}')
+            self.app_log.info('refresh rate changed', rate=self.refresh_rate)
             self.refresh_timer = self.set_interval(self.refresh_rate, self.update_printer, pause=not self.do_refresh)
 
+    def on_tabbed_content_tab_activated(self, event: TabbedContent.TabActivated):
+        # Each tab switch pushes idle prefetching back
+        if self.prefetch_timer:
+            self.prefetch_timer.stop()
+        self.prefetch_timer = self.set_timer(IDLE_PREFETCH_DELAY, self.prefetch_tabs)
+
+    @property
+    def main_screen(self) -> Screen:
+        """The dashboard screen, fleet and upload screens are pushed on top of it"""
+        return self.screen_stack[0]
+
+    def prefetch_tabs(self):
+        """Load the not yet visited lazy tab closest to the active one, one tab per idle tick"""
+        if self.screen is not self.main_screen:
+            # the user is busy elsewhere, try again once back on the dashboard
+            self.prefetch_timer = self.set_timer(IDLE_PREFETCH_DELAY, self.prefetch_tabs)
+            return
+        tabbed_content = self.main_screen.query_one(TabbedContent)
+        panes = list(tabbed_content.query(TabPane))
+        lazy_panes = [pane for pane in panes if isinstance(pane, LazyTabPane) and not pane.loaded]
+        if not lazy_panes:
+            return
+        if not any(pane.is_loading for pane in lazy_panes):
+            lazy_panes = [pane for pane in lazy_panes if pane.prefetch]
+            if not lazy_panes:
+                return
+
+            active = tabbed_content.active_pane
+            active_index = panes.index(active) if active in panes else 0
+            lazy_panes.sort(key=lambda pane: abs(panes.index(pane) - active_index))
+            lazy_panes[0].load()
+        self.prefetch_timer = self.set_timer(IDLE_PREFETCH_DELAY, self.prefetch_tabs)
+
     def update_printer(self):
         new_printer = self.client.get_printer(self.printer.uuid.get_secret_value())
         if self.printer.printer_state != new_printer.printer_state:
@@ -157,24 +253,94 @@ class PrusaConnectApp(App):
             # if new_printer.printer_state == 'PRINTING':
             #    self.query_one(DashboardPane).recompose()
 
-        for widget in self.query('.--requires-printer'):
+        self.alerts.evaluate(new_printer.uuid.get_secret_value(), new_printer)
+        self.telemetry.append(new_printer.uuid.get_secret_value(), new_printer)
+
+        # the dashboard keeps updating under the fleet and upload screens
+        for widget in self.main_screen.query('.--requires-printer'):
             widget.post_message(PrinterUpdated(printer=new_printer))
         self.printer = new_printer
 
-        # self.query_one(RichLog).write(f'updated {self.refresh_rate}')
+        # self.app_log.debug('updated', rate=self.refresh_rate)
+
+    @on(Button.Pressed, '#set-ready')
+    def set_ready(self, event: Button.Pressed):
+        event.button.disabled = True
+        command = CANCEL_PRINTER_READY if self.printer.printer_state == 'READY' else SET_PRINTER_READY
+        self.send_command(command, [self.printer.uuid.get_secret_value()])
+
+    @work(thread=True, group='commands', exit_on_error=False)
+    def send_command(self, command: str, printers: list[str]):
+        report = dispatch_command(self.client, printers, command, timeout=COMMAND_TIMEOUT)
+        self.call_from_thread(self.command_done, report)
+
+    def command_done(self, report: CommandReport):
+        for result in report.results:
+            self.app_log.info(report.command, status=result.status, state=result.state, error=result.error)
+        self.notify(report.summary(), title='Command', severity='information' if report.ok else 'error')
+        self.update_printer()
+        # the header only recomposes when the printer changed, a failed command leaves it as is
+        for button in self.main_screen.query('#set-ready').results(Button):
+            button.disabled = self.printer.printer_state == 'PRINTING'
+
+    def notify_alert(self, alert: Alert):
+        level = 'info' if alert.rule.severity == 'information' else alert.rule.severity
+        self.app_log.log(level, alert.message, rule=alert.rule.name, active=alert.active)
+        if alert.active:
+            self.notify(alert.message, title=alert.rule.name, severity=alert.rule.severity, timeout=10)
 
     def action_dump(self):
-        self.query_one(RichLog).write(self.tree)
+        console = Console(file=io.StringIO(), width=120)
+        console.print(self.tree)
+        self.app_log.info(console.file.getvalue())
+
+    def on_unmount(self):
+        self.telemetry.flush()
+        self.app_log.close()
+
+    def action_fleet(self):
+        self.push_screen(FleetScreen(self.client))
+
+    def on_fleet_table_selected(self, msg: FleetTable.Selected):
+        self.pop_screen()
+        if msg.printer_id == self.printer.uuid.get_secret_value():
+            return
+        self.select_printer(msg.printer_id)
+
+    @work(thread=True, exclusive=True, group='select-printer', exit_on_error=False)
+    def select_printer(self, printer_id: str):
+        try:
+            printer = self.client.get_printer(printer_id)
+            error = 'printer unavailable'
+        except (*TRANSPORT_ERRORS, ApiError) as e:
+            printer, error = None, str(e)
+        if printer is None:
+            # keep showing the current printer, the refresh timer still needs a valid one
+            self.call_from_thread(self.app_log.error, 'printer selection failed', printer=printer_id, error=error)
+            self.call_from_thread(self.notify, error, title='Printer selection', severity='error')
+            return
+        self.call_from_thread(self.printer_selected, printer)
+
+    async def printer_selected(self, printer: Printer):
+        self.printer = printer
+        self.app_log.info('printer selected', name=self.printer.name)
+        await self.recompose()
+
+    def action_upload(self):
+        self.push_screen(UploadScreen(self.client, self.printer, UploadState(SETTINGS.cache_dir / 'uploads.json')))
+
+    def action_transport_stats(self):
+        self.app_log.info(self.client.stats.summary())
 
     def action_toggle_refresh(self):
         if self.do_refresh:
             self.refresh_timer.pause()
-            self.query_one(TabbedContent).add_class('--app-paused')
-            self.query_one(RichLog).write('paused')
+            self.main_screen.query_one(TabbedContent).add_class('--app-paused')
+            self.app_log.info('paused')
         else:
             self.refresh_timer.resume()
-            self.query_one(TabbedContent).remove_class('--app-paused')
-            self.query_one(RichLog).write('resumed')
+            self.main_screen.query_one(TabbedContent).remove_class('--app-paused')
+            self.app_log.info('resumed')
         self.do_refresh = not self.do_refresh
 
 
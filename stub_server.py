@@ -0,0 +1,93 @@
+"""
+Local stand-in for the PrusaConnect endpoints that move binary content (camera snapshots, uploads).
+
+    python stub_server.py --port 8000 --images ./snapshots --uploads ./uploads
+    BASE_URL=http://127.0.0.1:8000/app/ python app.py
+"""
+import argparse
+import json
+import re
+import tempfile
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+CAMERAS = [{'id': 1, 'name': 'Stub camera'}, {'id': 2, 'name': 'Stub camera 2'}]
+
+
+def generated_snapshot(camera_id: int, width: int = 160, height: int = 120) -> bytes:
+    # A gradient that shifts every 5 seconds, so most polls get an unchanged frame
+    shift = int(time.time() // 5) * 16 + camera_id * 64
+    pixels = bytearray()
+    for y in range(height):
+        for x in range(width):
+            pixels += bytes(((x + shift) % 256, (y * 2) % 256, (x + y + shift) % 256))
+    return f'P6 {width} {height} 255\n'.encode() + bytes(pixels)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    images: list[Path] = []
+    uploads_dir: Path = Path(tempfile.gettempdir())
+    uploads: dict[str, dict] = {}
+
+    def send(self, body: bytes, content_type: str = 'application/json', status: int = 200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if re.fullmatch(r'/app/printers/[^/]+/cameras', self.path):
+            return self.send(json.dumps({'cameras': CAMERAS}).encode())
+        if match := re.fullmatch(r'/app/cameras/(\d+)/snapshots/last', self.path):
+            if self.images:
+                image = self.images[int(time.time() // 5) % len(self.images)]
+                return self.send(image.read_bytes(), 'image/jpeg')
+            return self.send(generated_snapshot(int(match.group(1))), 'image/x-portable-pixmap')
+        if re.fullmatch(r'/app/printers/[^/]+/storages', self.path):
+            return self.send(json.dumps({'storages': [{'name': 'usb', 'path': '/usb'}]}).encode())
+        if match := re.fullmatch(r'/app/uploads/([\w-]+)', self.path):
+            if upload := self.uploads.get(match.group(1)):
+                return self.send(json.dumps(upload).encode())
+        self.send(b'{}', status=404)
+
+    def do_POST(self):
+        if re.fullmatch(r'/app/printers/[^/]+/uploads', self.path):
+            request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            upload_id = uuid.uuid4().hex
+            self.uploads[upload_id] = {'id': upload_id, 'offset': 0, 'size': request['size'],
+                                       'filename': request['filename']}
+            (self.uploads_dir / f'{upload_id}-{request["filename"]}').touch()
+            return self.send(json.dumps(self.uploads[upload_id]).encode(), status=201)
+        self.send(b'{}', status=404)
+
+    def do_PUT(self):
+        match = re.fullmatch(r'/app/uploads/([\w-]+)', self.path)
+        upload = self.uploads.get(match.group(1)) if match else None
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        if not upload:
+            return self.send(b'{}', status=404)
+        start = int(re.match(r'bytes (\d+)-', self.headers['Content-Range']).group(1))
+        if start != upload['offset']:
+            return self.send(json.dumps(upload).encode(), status=409)
+        with (self.uploads_dir / f'{upload["id"]}-{upload["filename"]}').open('ab') as f:
+            f.write(body)
+        upload['offset'] += len(body)
+        self.send(json.dumps(upload).encode())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--images', type=Path, help='directory of snapshots to cycle through')
+    parser.add_argument('--uploads', type=Path, help='directory receiving uploaded files')
+    args = parser.parse_args()
+    if args.uploads:
+        args.uploads.mkdir(parents=True, exist_ok=True)
+        StubHandler.uploads_dir = args.uploads
+    if args.images:
+        StubHandler.images = sorted(p for p in args.images.iterdir() if p.is_file())
+    ThreadingHTTPServer((args.host, args.port), StubHandler).serve_forever()
@@ -0,0 +1,75 @@
+from textual_prusa_connect.alerts import DEFAULT_RULES, AlertEngine, Rule
+
+
+def rule(name: str) -> Rule:
+    return next(rule for rule in DEFAULT_RULES if rule.name == name)
+
+
+def printer(state='PRINTING', bed=60.0, target_bed=60.0, nozzle=215.0, target_nozzle=215.0, z=1.0,
+            progress=10, time_printing=3600, time_remaining=3600, total_height=20.0):
+    return {
+        'printer_state': state,
+        'axis_z': z,
+        'temp': {'temp_bed': bed, 'target_bed': target_bed, 'temp_nozzle': nozzle, 'target_nozzle': target_nozzle},
+        'job_info': {'progress': progress, 'time_printing': time_printing, 'time_remaining': time_remaining,
+                     'total_height': total_height},
+    }
+
+
+def run(engine: AlertEngine, samples, step: float = 5) -> list[tuple[float, str, bool]]:
+    alerts = []
+    for i, sample in enumerate(samples):
+        alerts += [(i * step, alert.rule.name, alert.active) for alert in engine.evaluate('printer', sample, i * step)]
+    return alerts
+
+
+def test_heat_up_does_not_drift():
+    engine = AlertEngine([rule('Bed temperature drift')])
+    assert run(engine, [printer(bed=25 + i) for i in range(36)], step=4) == []
+
+
+def test_drift_after_target_reached():
+    engine = AlertEngine([rule('Bed temperature drift')])
+    samples = [printer(bed=60)] + [printer(bed=50)] * 20 + [printer(bed=60)]
+    assert run(engine, samples) == [(65, 'Bed temperature drift', True), (105, 'Bed temperature drift', False)]
+
+
+def test_new_target_disarms_drift():
+    engine = AlertEngine([rule('Nozzle temperature drift')])
+    # probing at 170 then heating to 215
+    samples = [printer(nozzle=170, target_nozzle=170)] * 3 + [printer(nozzle=175, target_nozzle=215)] * 20
+    assert run(engine, samples) == []
+
+
+def test_hold_fires_from_deadline_without_input_change():
+    engine = AlertEngine([Rule('hot', ('temp.temp_bed',), lambda temp: temp > 100, 'hot', hold=30)])
+    assert engine.evaluate('printer', printer(bed=110), 0) == []
+    assert engine.evaluate('printer', printer(bed=110), 29) == []
+    assert [alert.active for alert in engine.evaluate('printer', printer(bed=110), 30)] == [True]
+
+
+def test_progress_unknown_never_stalls():
+    engine = AlertEngine([rule('Progress stalled')])
+    assert run(engine, [printer(progress=None)] * 300, step=10) == []
+
+
+def test_progress_hold_follows_print_duration():
+    engine = AlertEngine([rule('Progress stalled')])
+    # 40h print, one percent is expected to take 24 minutes, the hold is 72 minutes
+    samples = [printer(progress=50, time_printing=72000 + i * 60, time_remaining=72000 - i * 60)
+               for i in range(80)]
+    alerts = run(engine, samples, step=60)
+    assert alerts == [(72 * 60, 'Progress stalled', True)]
+
+
+def test_progress_change_clears_stall():
+    engine = AlertEngine([rule('Progress stalled')])
+    samples = [printer(progress=10)] * 12 + [printer(progress=11)]
+    assert run(engine, samples, step=60) == [(600, 'Progress stalled', True), (720, 'Progress stalled', False)]
+
+
+def test_z_hold_allows_long_layers():
+    engine = AlertEngine([rule('Z axis stuck')])
+    # 20h print only 10mm tall, a 0.3mm layer takes 36 minutes, the hold is 108 minutes
+    samples = [printer(z=2.0, time_printing=36000, time_remaining=36000, total_height=10) for _ in range(120)]
+    assert run(engine, samples, step=60) == [(108 * 60, 'Z axis stuck', True)]
@@ -0,0 +1,170 @@
+import struct
+import zlib
+
+import pytest
+
+from textual_prusa_connect.bgcode import (
+    COMPRESSION_DEFLATE, COMPRESSION_HEATSHRINK_11_4, COMPRESSION_HEATSHRINK_12_4, COMPRESSION_NONE,
+    ENCODING_MEATPACK, ENCODING_NONE, LayerIndex, LayerIndexStore, MeatPackDecoder, build_layer_index,
+    heatshrink_decode,
+)
+
+MEATPACK_TABLE = b'0123456789. \nGX'
+
+
+def heatshrink_encode(data: bytes, window_bits: int, lookahead_bits: int) -> bytes:
+    """Greedy reference encoder, slow but enough for small fixtures"""
+    bits = []
+
+    def put(value: int, count: int):
+        bits.extend((value >> (count - 1 - i)) & 1 for i in range(count))
+
+    i = 0
+    while i < len(data):
+        best_length, best_offset = 0, 0
+        for offset in range(1, min(i, 1 << window_bits) + 1):
+            length = 0
+            while length < (1 << lookahead_bits) and i + length < len(data) \
+                    and data[i + length] == data[i - offset + length]:
+                length += 1
+            if length > best_length:
+                best_length, best_offset = length, offset
+        if best_length >= 3:
+            put(0, 1)
+            put(best_offset - 1, window_bits)
+            put(best_length - 1, lookahead_bits)
+            i += best_length
+        else:
+            put(1, 1)
+            put(data[i], 8)
+            i += 1
+    bits.extend([0] * (-len(bits) % 8))
+    return bytes(int(''.join(map(str, bits[k:k + 8])), 2) for k in range(0, len(bits), 8))
+
+
+def meatpack_encode(data: bytes) -> bytes:
+    """Packs pairs of characters, with packing and no-spaces mode enabled"""
+    out = bytearray(b'\xff\xff\xfb\xff\xff\xf7')
+
+    def nibble(char: int) -> int | None:
+        if char == ord('E'):
+            return 11
+        index = MEATPACK_TABLE.find(bytes([char]))
+        return index if index >= 0 and char != ord(' ') else None
+
+    i = 0
+    while i < len(data):
+        first = data[i]
+        if first == ord('\n'):
+            out.append(12)
+            i += 1
+            continue
+        second = data[i + 1] if i + 1 < len(data) else ord('\n')
+        low, high = nibble(first), nibble(second)
+        if second == ord('\n') and low is not None:
+            out.append(low | 12 << 4)
+        elif low is not None and high is not None:
+            out.append(low | high << 4)
+        elif low is not None:
+            out += bytes([low | 0xF0, second])
+        elif high is not None:
+            out += bytes([0x0F | high << 4, first])
+        else:
+            out += bytes([0xFF, first, second])
+        i += 2
+    return bytes(out)
+
+
+def block(block_type: int, compression: int, payload: bytes, params: bytes = b'\0\0') -> bytes:
+    if compression == COMPRESSION_NONE:
+        header = struct.pack('<HHI', block_type, compression, len(payload))
+        data = payload
+    else:
+        data = {
+            COMPRESSION_DEFLATE: zlib.compress,
+            COMPRESSION_HEATSHRINK_11_4: lambda raw: heatshrink_encode(raw, 11, 4),
+            COMPRESSION_HEATSHRINK_12_4: lambda raw: heatshrink_encode(raw, 12, 4),
+        }[compression](payload)
+        header = struct.pack('<HHII', block_type, compression, len(payload), len(data))
+    body = header + params + data
+    return body + struct.pack('<I', zlib.crc32(body))
+
+
+def bgcode(gcode: bytes, compression: int, encoding: int, block_size: int = 400) -> bytes:
+    data = b'GCDE' + struct.pack('<IH', 1, 1)
+    data += block(0, COMPRESSION_NONE, b'Producer=test')
+    data += block(5, COMPRESSION_NONE, b'\x89PNG', params=struct.pack('<HHH', 0, 16, 16))
+    if encoding == ENCODING_MEATPACK:
+        gcode = meatpack_encode(gcode)
+    for start in range(0, len(gcode), block_size):
+        data += block(1, compression, gcode[start:start + block_size], params=struct.pack('<H', encoding))
+    return data
+
+
+def chunked(data: bytes, size: int = 97):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+# no spaces, MeatPack no-spaces mode drops them
+GCODE = '\n'.join([
+    'M83', 'M73P0R10',
+    ';Z:0.2', 'G1X10Y10E1.5', 'G1E-0.8', 'G1E0.8', 'G1X20Y10E2.5', 'M73P50R5',
+    ';Z:0.4', 'G1X10Y20E3', 'G1E-0.8', 'G1E0.8', 'M73P90R1',
+    ';Z:0.6', 'G1X20Y20E1',
+]).encode() + b'\n'
+
+
+def test_heatshrink_round_trip():
+    data = b'G1 X10.000 Y10.000 E0.05000\n' * 40 + bytes(range(256))
+    assert heatshrink_decode(heatshrink_encode(data, 11, 4), 11, 4) == data
+    assert heatshrink_decode(heatshrink_encode(data, 12, 4), 12, 4) == data
+
+
+def test_meatpack_round_trip():
+    assert MeatPackDecoder().decode(meatpack_encode(GCODE)) == GCODE
+
+
+def test_plain_gcode_layers():
+    index = build_layer_index(chunked(GCODE))
+    assert list(index.z) == [0.2, 0.4, 0.6]
+    assert list(index.time) == [0.0, 300.0, 540.0]
+    assert index.total_time == 600.0
+    # retractions and unretractions cancel out
+    assert list(index.filament) == [0.0, 4.0, 7.0]
+
+
+def test_absolute_extrusion():
+    gcode = b'M82\n;Z:0.2\nG1E5\nG1E4.2\nG1E5\nG92E0\n;Z:0.4\nG1E2\n;Z:0.6\n'
+    assert list(build_layer_index([gcode]).filament) == [0.0, 5.0, 7.0]
+
+
+@pytest.mark.parametrize('compression', [
+    COMPRESSION_NONE, COMPRESSION_DEFLATE, COMPRESSION_HEATSHRINK_11_4, COMPRESSION_HEATSHRINK_12_4,
+])
+@pytest.mark.parametrize('encoding', [ENCODING_NONE, ENCODING_MEATPACK])
+def test_binary_gcode_matches_plain(compression, encoding):
+    expected = build_layer_index([GCODE])
+    assert build_layer_index(chunked(bgcode(GCODE, compression, encoding))) == expected
+
+
+def test_layer_index_save_load(tmp_path):
+    index = build_layer_index([GCODE])
+    index.save(tmp_path / 'a.layers')
+    assert LayerIndex.load(tmp_path / 'a.layers') == index
+    assert list(tmp_path.iterdir()) == [tmp_path / 'a.layers']
+
+
+def test_store_rebuilds_truncated_table(tmp_path):
+    class Client:
+        downloads = 0
+
+        def iter_file(self, printer, file_hash):
+            Client.downloads += 1
+            return iter([GCODE])
+
+    LayerIndexStore(Client(), tmp_path).get('printer', 'hash')
+    path = tmp_path / 'hash.layers'
+    path.write_bytes(path.read_bytes()[:-8])
+    index = LayerIndexStore(Client(), tmp_path).get('printer', 'hash')
+    assert len(index) == 3
+    assert Client.downloads == 2
@@ -0,0 +1,46 @@
+import time
+from types import SimpleNamespace
+
+from textual_prusa_connect.commands import SET_PRINTER_READY, dispatch_command
+from textual_prusa_connect.connect_api import ApiError
+
+
+class FakeClient:
+    """Printers turn READY 0.2s after the command, `slow` answers in 2s and `hung` never does"""
+    max_workers = 8
+
+    def __init__(self):
+        self.sent = {}
+
+    def set_sync(self, printer, command):
+        if printer == 'broken':
+            raise ApiError(500, 'boom')
+        self.sent[printer] = time.monotonic()
+
+    def get_printer(self, printer):
+        if printer == 'slow':
+            time.sleep(2)
+        elif printer == 'hung':
+            time.sleep(60)
+        ready = time.monotonic() - self.sent[printer] > 0.2
+        return SimpleNamespace(printer_state='READY' if ready else 'IDLE')
+
+
+def test_slow_printer_does_not_delay_the_others():
+    printers = [f'fast-{i}' for i in range(20)] + ['slow', 'hung', 'broken']
+    acked_at = {}
+    started = time.monotonic()
+
+    def progress(result):
+        acked_at[result.printer] = time.monotonic() - started
+
+    report = dispatch_command(FakeClient(), printers, SET_PRINTER_READY, timeout=1.5, poll_interval=0.1,
+                              progress=progress)
+
+    statuses = {result.printer: result.status for result in report.results}
+    assert all(statuses[f'fast-{i}'] == 'acked' for i in range(20))
+    assert max(acked_at[f'fast-{i}'] for i in range(20)) < 1
+    assert statuses['slow'] == statuses['hung'] == 'timeout'
+    assert statuses['broken'] == 'error'
+    # the hung request is not waited for
+    assert time.monotonic() - started < 2
@@ -0,0 +1,55 @@
+import json
+
+from textual_prusa_connect.cache import JobCache
+from textual_prusa_connect.connect_api import ApiError, PrusaConnectAPI, ResourceNotFound
+
+
+class Response:
+    def __init__(self, status_code: int, payload=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.text = json.dumps(payload)
+
+    def json(self):
+        return self.payload
+
+
+def job_payload(job_id: int, state: str) -> dict:
+    return {'id': job_id, 'printer_uuid': 'printer', 'origin_id': 1, 'path': '/usb/a.bgcode', 'state': state,
+            'start': 1700000000, 'end': 1700003600, 'source': 'CONNECT_USER',
+            'file': {'name': 'a.bgcode', 'size': 1, 'display_name': 'a', 'sync': {}}}
+
+
+class FakeAPI(PrusaConnectAPI):
+    """Jobs 1 and 2 are finished, 3 is still printing, 4 was deleted and 5 fails"""
+
+    def __init__(self, cache: JobCache):
+        super().__init__({}, job_cache=cache, http2=False, base_url='http://connect/')
+        self.fetched = []
+
+    def _get(self, url: str):
+        job_id = int(url.rsplit('/', 1)[1])
+        self.fetched.append(job_id)
+        if job_id == 4:
+            return Response(404, 'gone')
+        if job_id == 5:
+            return Response(503, 'busy')
+        return Response(200, job_payload(job_id, 'PRINTING' if job_id == 3 else 'FIN_OK'))
+
+
+def test_bulk_fetch_keeps_going_and_caches_finished_jobs(tmp_path):
+    api = FakeAPI(JobCache(tmp_path))
+    details = api.get_jobs_details([1, 2, 3, 4, 5])
+    assert list(details) == [1, 2, 3, 4, 5]
+    assert [details[job_id].id for job_id in (1, 2, 3)] == [1, 2, 3]
+    assert isinstance(details[4], ResourceNotFound)
+    assert isinstance(details[5], ApiError) and details[5].status == 503
+    assert sorted(api.fetched) == [1, 2, 3, 4, 5]
+
+    # a new process: finished jobs come from disk, the rest is fetched again
+    api = FakeAPI(JobCache(tmp_path))
+    details = api.get_jobs_details([1, 2, 3, 4, 5])
+    assert sorted(api.fetched) == [3, 4, 5]
+    assert details[1].state == 'FIN_OK'
+    assert api.get_job(2).id == 2
+    assert sorted(api.fetched) == [3, 4, 5]
@@ -0,0 +1,34 @@
+import random
+
+from textual_prusa_connect.models import Job
+from textual_prusa_connect.timeline import PrinterTimeline
+
+
+def job(job_id: int, start: int, end: int) -> Job:
+    return Job(id=job_id, printer_uuid='printer', origin_id=1, path='/usb/a.bgcode', state='FIN_OK',
+               start=start, end=end, source='CONNECT_USER',
+               file={'name': 'a.bgcode', 'size': 1, 'display_name': 'a', 'sync': {}})
+
+
+def test_jobs_sharing_a_start():
+    timeline = PrinterTimeline([job(1, 0, 100), job(2, 0, 10)], now=1000)
+    assert [found.id for found in timeline.jobs_between(50, 60)] == [1]
+    assert {found.id for found in timeline.jobs_between(5, 6)} == {1, 2}
+
+
+def test_matches_brute_force():
+    rng = random.Random(36)
+    jobs = []
+    for job_id in range(300):
+        start = rng.randrange(0, 10_000)
+        jobs.append(job(job_id, start, start + rng.choice([0, 5, 50, 500])))
+    timeline = PrinterTimeline(jobs, now=20_000)
+    busy_seconds = [0] * 12_000
+    for j in jobs:
+        busy_seconds[j.start:j.end] = [1] * (j.end - j.start)
+    for _ in range(500):
+        lo = rng.randrange(0, 11_000)
+        hi = lo + rng.randrange(1, 2_000)
+        expected = {j.id for j in jobs if j.start < hi and j.end > lo}
+        assert {found.id for found in timeline.jobs_between(lo, hi)} == expected
+        assert timeline.busy(lo, hi) == sum(busy_seconds[lo:hi])
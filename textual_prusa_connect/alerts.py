@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import heapq
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Literal
+
+Severity = Literal['information', 'warning', 'error']
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    `condition` and `message` receive the values of `inputs` positionally, inputs are dotted
+    paths into the printer (`temp.temp_nozzle`, `job_info.progress`...).
+    The alert fires once the condition held for `hold` seconds (or `hold(*inputs)` seconds),
+    with `rearm` any change of an input restarts that countdown, or only of the listed inputs
+    (useful to detect values that stopped moving).
+    With `armed` the rule stays silent until `armed` held once, any change of a `disarm_on`
+    input makes it wait again (e.g. until a new temperature target is first reached).
+    """
+    name: str
+    inputs: tuple[str, ...]
+    condition: Callable[..., bool]
+    message: str
+    severity: Severity = 'warning'
+    hold: float | Callable[..., float] = 0
+    rearm: bool | tuple[str, ...] = False
+    armed: Callable[..., bool] | None = None
+    disarm_on: tuple[str, ...] = ()
+
+
+@dataclass
+class Alert:
+    rule: Rule
+    printer_id: str
+    message: str
+    active: bool
+    time: float
+
+
+Sink = Callable[[Alert], None]
+
+
+@dataclass
+class _RuleState:
+    since: float | None = None
+    firing: bool = False
+    generation: int = 0
+    armed: bool = False
+
+
+@dataclass
+class _PrinterState:
+    values: dict[str, Any] = field(default_factory=dict)
+    rules: dict[int, _RuleState] = field(default_factory=lambda: defaultdict(_RuleState))
+    deadlines: list[tuple[float, int, int]] = field(default_factory=list)
+
+
+def _compile_path(path: str) -> Callable[[Any], Any]:
+    parts = tuple(path.split('.'))
+
+    def getter(obj):
+        for part in parts:
+            obj = obj.get(part) if isinstance(obj, dict) else getattr(obj, part, None)
+            if obj is None:
+                return None
+        return obj
+    return getter
+
+
+class AlertEngine:
+    """
+    Evaluates rules against successive printer states, only rules whose inputs changed
+    (or whose hold countdown expired) are evaluated on each update.
+    """
+
+    def __init__(self, rules: list[Rule], sinks: list[Sink] | None = None):
+        self.rules = list(rules)
+        self.sinks = list(sinks or [])
+        self._dependents: dict[str, list[int]] = defaultdict(list)
+        for index, rule in enumerate(self.rules):
+            for path in dict.fromkeys(rule.inputs + rule.disarm_on):
+                self._dependents[path].append(index)
+        self._getters = {path: _compile_path(path) for path in self._dependents}
+        self._printers: dict[str, _PrinterState] = defaultdict(_PrinterState)
+
+    def evaluate(self, printer_id: str, printer: Any, now: float | None = None) -> list[Alert]:
+        now = time.monotonic() if now is None else now
+        state = self._printers[printer_id]
+
+        changed: set[int] = set()
+        changed_paths: set[str] = set()
+        for path, getter in self._getters.items():
+            value = getter(printer)
+            if path not in state.values or state.values[path] != value:
+                state.values[path] = value
+                changed.update(self._dependents[path])
+                changed_paths.add(path)
+
+        due = set(changed)
+        while state.deadlines and state.deadlines[0][0] <= now:
+            _, index, generation = heapq.heappop(state.deadlines)
+            if state.rules[index].generation == generation:
+                due.add(index)
+
+        alerts = []
+        for index in sorted(due):
+            alert = self._evaluate_rule(printer_id, state, index, changed_paths if index in changed else set(), now)
+            if alert:
+                alerts.append(alert)
+        for alert in alerts:
+            for sink in self.sinks:
+                sink(alert)
+        return alerts
+
+    def _evaluate_rule(self, printer_id: str, state: _PrinterState, index: int, changed_paths: set[str],
+                       now: float) -> Alert | None:
+        rule = self.rules[index]
+        rule_state = state.rules[index]
+        args = [state.values[path] for path in rule.inputs]
+        watched = rule.inputs if rule.rearm is True else rule.rearm or ()
+        rearmed = any(path in changed_paths for path in watched)
+        if rule.armed is not None:
+            if any(path in changed_paths for path in rule.disarm_on):
+                rule_state.armed = False
+            if not rule_state.armed:
+                try:
+                    rule_state.armed = bool(rule.armed(*args))
+                except (TypeError, ValueError, KeyError):
+                    pass
+        try:
+            holds = (rule.armed is None or rule_state.armed) and bool(rule.condition(*args))
+        except (TypeError, ValueError, KeyError):
+            holds = False
+
+        if not holds:
+            rule_state.since = None
+            rule_state.generation += 1
+            if rule_state.firing:
+                rule_state.firing = False
+                return Alert(rule, printer_id, f'{rule.name} cleared', active=False, time=now)
+            return None
+
+        alert = None
+        if rule_state.since is None or rearmed:
+            rule_state.since = now
+            if rearmed and rule_state.firing:
+                # the value moved again, the problem went away
+                rule_state.firing = False
+                alert = Alert(rule, printer_id, f'{rule.name} cleared', active=False, time=now)
+        if rule_state.firing:
+            return None
+        hold = rule.hold(*args) if callable(rule.hold) else rule.hold
+        if now - rule_state.since >= hold:
+            rule_state.firing = True
+            return Alert(rule, printer_id, rule.message.format(*args), active=True, time=now)
+        rule_state.generation += 1
+        heapq.heappush(state.deadlines, (rule_state.since + hold, index, rule_state.generation))
+        return alert
+
+
+def _printing(state) -> bool:
+    return state == 'PRINTING'
+
+
+def _reached(state, temp, target, tolerance) -> bool:
+    return _printing(state) and bool(target) and abs(temp - target) <= tolerance
+
+
+def _print_time(time_printing, time_remaining) -> float | None:
+    if time_printing is None or time_remaining in (None, -1):
+        return None
+    return time_printing + time_remaining
+
+
+def _progress_hold(state, progress, time_printing, time_remaining) -> float:
+    """Three times the expected duration of one percent, at least 10 minutes"""
+    total = _print_time(time_printing, time_remaining)
+    return max(600.0, 3 * total / 100) if total else 600.0
+
+
+def _z_hold(state, z, time_printing, time_remaining, total_height) -> float:
+    """Three times the expected duration of a 0.3mm layer, at least 15 minutes"""
+    total = _print_time(time_printing, time_remaining)
+    return max(900.0, 3 * total * 0.3 / total_height) if total and total_height else 900.0
+
+
+DEFAULT_RULES = [
+    Rule('Nozzle temperature drift',
+         ('printer_state', 'temp.temp_nozzle', 'temp.target_nozzle'),
+         lambda state, temp, target: _printing(state) and bool(target) and abs(temp - target) > 10,
+         'Nozzle at {1:.1f}°C, target is {2:.1f}°C',
+         hold=30,
+         # ignore heat ups, including the reheat after probing
+         armed=lambda state, temp, target: _reached(state, temp, target, 10),
+         disarm_on=('printer_state', 'temp.target_nozzle')),
+    Rule('Bed temperature drift',
+         ('printer_state', 'temp.temp_bed', 'temp.target_bed'),
+         lambda state, temp, target: _printing(state) and bool(target) and abs(temp - target) > 5,
+         'Bed at {1:.1f}°C, target is {2:.1f}°C',
+         hold=60,
+         armed=lambda state, temp, target: _reached(state, temp, target, 5),
+         disarm_on=('printer_state', 'temp.target_bed')),
+    Rule('Progress stalled',
+         ('printer_state', 'job_info.progress', 'job_info.time_printing', 'job_info.time_remaining'),
+         lambda state, progress, *_: _printing(state) and progress is not None,
+         'Progress stuck at {1}%',
+         severity='error', hold=_progress_hold, rearm=('printer_state', 'job_info.progress')),
+    Rule('Z axis stuck',
+         ('printer_state', 'axis_z', 'job_info.time_printing', 'job_info.time_remaining', 'job_info.total_height'),
+         lambda state, z, *_: _printing(state) and z is not None,
+         'Z axis stuck at {1}mm',
+         severity='error', hold=_z_hold, rearm=('printer_state', 'axis_z')),
+]
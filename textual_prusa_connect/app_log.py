@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40}
+
+
+@dataclass
+class LogRecord:
+    seq: int
+    time: float
+    level: str
+    message: str
+    fields: dict[str, Any] = field(default_factory=dict)
+
+
+Sink = Callable[[LogRecord], None]
+
+
+class AppLog:
+    """Structured application log, only the last `maxlen` records are kept in memory"""
+
+    def __init__(self, maxlen: int = 5000, level: str = 'info', sinks: list[Sink] | None = None):
+        self.records: deque[LogRecord] = deque(maxlen=maxlen)
+        self.level = level.lower()
+        if self.level not in LEVELS:
+            raise ValueError(f'unknown log level {level!r}, expected one of {", ".join(LEVELS)}')
+        self.sinks = list(sinks or [])
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def last_seq(self) -> int:
+        return self.records[-1].seq if self.records else -1
+
+    def log(self, level: str, message: Any, **fields: Any):
+        if LEVELS[level] < LEVELS[self.level]:
+            return
+        now = time.time()
+        records = []
+        with self._lock:
+            # one record per line, the log view renders a single line per record
+            for line in str(message).splitlines() or ['']:
+                record = LogRecord(next(self._seq), now, level, line, fields)
+                self.records.append(record)
+                records.append(record)
+        for record in records:
+            for sink in self.sinks:
+                sink(record)
+
+    def debug(self, message: Any, **fields: Any):
+        self.log('debug', message, **fields)
+
+    def info(self, message: Any, **fields: Any):
+        self.log('info', message, **fields)
+
+    def warning(self, message: Any, **fields: Any):
+        self.log('warning', message, **fields)
+
+    def error(self, message: Any, **fields: Any):
+        self.log('error', message, **fields)
+
+    def close(self):
+        for sink in self.sinks:
+            if hasattr(sink, 'close'):
+                sink.close()
+
+
+class JsonlFileSink:
+    """
+    Appends records to a JSONL file from a background thread, in batches of up to `batch_size`
+    records or every `flush_interval` seconds. The file is rotated to `<path>.1` past `max_bytes`.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 200, flush_interval: float = 1.0,
+                 max_bytes: int = 10 * 1024 * 1024):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self._queue: queue.SimpleQueue[LogRecord | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name='jsonl-log-sink', daemon=True)
+        self._thread.start()
+
+    def __call__(self, record: LogRecord):
+        self._queue.put(record)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        done = False
+        while not done:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if record is None:
+                    done = True
+                    break
+                batch.append(record)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch: list[LogRecord]):
+        lines = ''.join(json.dumps(asdict(record), default=str) + '\n' for record in batch)
+        try:
+            if self.path.exists() and self.path.stat().st_size > self.max_bytes:
+                self.path.replace(self.path.with_name(self.path.name + '.1'))
+            with self.path.open('a', encoding='utf-8') as f:
+                f.write(lines)
+        except OSError:
+            # Never let logging take the app down
+            pass
@@ -65,7 +65,8 @@ class PrinterHeader(Widget):
                         remaining = datetime.timedelta(seconds=self.printer.job_info['time_remaining'])
                     eta = f'[green]{elapsed} / {remaining}'
                 yield Static(eta)
-            yield Button("🚀 Set Ready", disabled=self.printer.printer_state == "PRINTING")
+            label = "✖ Cancel Ready" if self.printer.printer_state == "READY" else "🚀 Set Ready"
+            yield Button(label, id='set-ready', disabled=self.printer.printer_state == "PRINTING")
 
     def on_mount(self):
         self.border_title = f'[darkviolet]{self.printer.name} - {self.printer.printer_model}'
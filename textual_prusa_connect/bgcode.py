@@ -0,0 +1,372 @@
+"""
+Layer table of a sliced file, built in a single streaming pass over plain G-code or binary G-code (.bgcode).
+
+Binary G-code layout: `GCDE` magic, u32 version, u16 checksum type, then blocks of
+u16 type, u16 compression, u32 uncompressed size, [u32 compressed size], parameters, data, [crc32].
+"""
+from __future__ import annotations
+
+import os
+import re
+import struct
+import threading
+import zlib
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+MAGIC = b'GCDE'
+BLOCK_GCODE = 1
+BLOCK_THUMBNAIL = 5
+COMPRESSION_NONE, COMPRESSION_DEFLATE, COMPRESSION_HEATSHRINK_11_4, COMPRESSION_HEATSHRINK_12_4 = range(4)
+ENCODING_NONE, ENCODING_MEATPACK, ENCODING_MEATPACK_COMMENTS = range(3)
+
+
+def heatshrink_decode(data: bytes, window_bits: int, lookahead_bits: int) -> bytes:
+    out = bytearray()
+    data = bytes(data) + b'\0\0'
+    size = (len(data) - 2) * 8
+    position = 0
+
+    def read(count: int) -> int | None:
+        # count <= 12 so the bits always sit in 3 consecutive bytes
+        nonlocal position
+        if position + count > size:
+            return None
+        offset = position >> 3
+        chunk = (data[offset] << 16) | (data[offset + 1] << 8) | data[offset + 2]
+        value = (chunk >> (24 - (position & 7) - count)) & ((1 << count) - 1)
+        position += count
+        return value
+
+    while True:
+        tag = read(1)
+        if tag is None:
+            break
+        if tag:
+            byte = read(8)
+            if byte is None:
+                break
+            out.append(byte)
+        else:
+            index = read(window_bits)
+            count = read(lookahead_bits)
+            if index is None or count is None:
+                break
+            index += 1
+            for _ in range(count + 1):
+                out.append(out[-index] if index <= len(out) else 0)
+    return bytes(out)
+
+
+class MeatPackDecoder:
+    """Stateful MeatPack decoder, same state machine as the Marlin/Prusa firmware"""
+    SIGNAL = 0xFF
+    TABLE = b'0123456789. \nGX'
+    ENABLE_PACKING, DISABLE_PACKING, RESET_ALL, ENABLE_NO_SPACES, DISABLE_NO_SPACES = 251, 250, 249, 247, 248
+
+    def __init__(self):
+        self.packing = False
+        self.no_spaces = False
+        self.signals = 0
+        self.command_next = False
+        self.full_chars = 0
+        self.pending: int | None = None
+
+    def _char(self, nibble: int) -> int:
+        if nibble == 11 and self.no_spaces:
+            return ord('E')
+        return self.TABLE[nibble]
+
+    def _inner(self, byte: int, out: bytearray):
+        if not self.packing:
+            out.append(byte)
+            return
+        if self.full_chars:
+            out.append(byte)
+            if self.pending is not None:
+                out.append(self.pending)
+                self.pending = None
+            self.full_chars -= 1
+            return
+        low, high = byte & 0xF, byte >> 4
+        if low == 0xF:
+            self.full_chars += 1
+            if high == 0xF:
+                self.full_chars += 1
+            else:
+                self.pending = self._char(high)
+            return
+        first = self._char(low)
+        out.append(first)
+        if first != ord('\n'):
+            if high == 0xF:
+                self.full_chars += 1
+            else:
+                out.append(self._char(high))
+
+    def _command(self, command: int):
+        if command == self.ENABLE_PACKING:
+            self.packing = True
+        elif command == self.DISABLE_PACKING:
+            self.packing = False
+        elif command == self.ENABLE_NO_SPACES:
+            self.no_spaces = True
+        elif command == self.DISABLE_NO_SPACES:
+            self.no_spaces = False
+        elif command == self.RESET_ALL:
+            self.packing = self.no_spaces = False
+
+    def decode(self, data: bytes) -> bytes:
+        out = bytearray()
+        for byte in data:
+            if byte == self.SIGNAL:
+                if self.signals:
+                    self.command_next = True
+                    self.signals = 0
+                else:
+                    self.signals += 1
+            elif self.command_next:
+                self._command(byte)
+                self.command_next = False
+            else:
+                if self.signals:
+                    self._inner(self.SIGNAL, out)
+                    self.signals = 0
+                self._inner(byte, out)
+        return bytes(out)
+
+
+class BgcodeReader:
+    """Push parser, `feed` it raw file chunks and G-code text comes out of `on_gcode`"""
+
+    def __init__(self, on_gcode: Callable[[bytes], None]):
+        self.on_gcode = on_gcode
+        self.buffer = bytearray()
+        self.binary: bool | None = None
+        self.checksum_size = 0
+        self.meatpack = MeatPackDecoder()
+
+    def feed(self, data: bytes):
+        if self.binary is False:
+            self.on_gcode(data)
+            return
+        self.buffer += data
+        if self.binary is None:
+            if len(self.buffer) < 10:
+                return
+            self.binary = self.buffer[:4] == MAGIC
+            if not self.binary:
+                self.on_gcode(bytes(self.buffer))
+                self.buffer.clear()
+                return
+            _, checksum_type = struct.unpack_from('<IH', self.buffer, 4)
+            self.checksum_size = 4 if checksum_type == 1 else 0
+            del self.buffer[:10]
+        while self._block():
+            pass
+
+    def _block(self) -> bool:
+        if len(self.buffer) < 8:
+            return False
+        block_type, compression, size = struct.unpack_from('<HHI', self.buffer)
+        header_size = 8
+        data_size = size
+        if compression != COMPRESSION_NONE:
+            if len(self.buffer) < 12:
+                return False
+            data_size, = struct.unpack_from('<I', self.buffer, 8)
+            header_size = 12
+        params_size = 6 if block_type == BLOCK_THUMBNAIL else 2
+        total = header_size + params_size + data_size + self.checksum_size
+        if len(self.buffer) < total:
+            return False
+        if block_type == BLOCK_GCODE:
+            encoding, = struct.unpack_from('<H', self.buffer, header_size)
+            start = header_size + params_size
+            data = bytes(self.buffer[start:start + data_size])
+            if compression == COMPRESSION_DEFLATE:
+                data = zlib.decompress(data)
+            elif compression == COMPRESSION_HEATSHRINK_11_4:
+                data = heatshrink_decode(data, 11, 4)
+            elif compression == COMPRESSION_HEATSHRINK_12_4:
+                data = heatshrink_decode(data, 12, 4)
+            if encoding in (ENCODING_MEATPACK, ENCODING_MEATPACK_COMMENTS):
+                data = self.meatpack.decode(data)
+            self.on_gcode(data)
+        del self.buffer[:total]
+        return True
+
+
+_E_RE = re.compile(r'E(-?\d*\.?\d+)')
+_R_RE = re.compile(r'R(\d+)')
+
+
+@dataclass
+class LayerIndex:
+    """Per layer z height, seconds since the start of the print and filament used in mm"""
+    z: array
+    time: array
+    filament: array
+    total_time: float = 0.0
+
+    def __len__(self) -> int:
+        return len(self.z)
+
+    def layer_at(self, axis_z: float) -> int:
+        return max(bisect_right(self.z, axis_z + 1e-4) - 1, 0)
+
+    def remaining_time(self, axis_z: float, time_printing: float | None = None) -> float:
+        """
+        Slicer time left from the layer at `axis_z`, scaled by how fast the print went so far
+        when `time_printing` is known
+        """
+        layer = self.layer_at(axis_z)
+        remaining = self.total_time - self.time[layer]
+        # the first minutes are dominated by heating, too noisy to extrapolate from
+        if time_printing and self.time[layer] > 60:
+            remaining *= time_printing / self.time[layer]
+        return remaining
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write then rename, same as JobCache, a crash never leaves a truncated table behind
+        tmp = path.with_name(f'.{path.name}.{threading.get_ident()}.tmp')
+        with tmp.open('wb') as f:
+            array('q', [len(self)]).tofile(f)
+            array('d', [self.total_time]).tofile(f)
+            for column in (self.z, self.time, self.filament):
+                column.tofile(f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> LayerIndex:
+        with path.open('rb') as f:
+            count = array('q')
+            count.fromfile(f, 1)
+            total_time = array('d')
+            total_time.fromfile(f, 1)
+            columns = []
+            for _ in range(3):
+                column = array('d')
+                column.fromfile(f, count[0])
+                columns.append(column)
+        return cls(*columns, total_time=total_time[0])
+
+
+class LayerIndexBuilder:
+    """Scans G-code text for `;Z:` layer changes, `M73 R` remaining minutes and extrusion"""
+
+    def __init__(self):
+        self.index = LayerIndex(array('d'), array('d'), array('d'))
+        self.partial = b''
+        self.total_minutes: int | None = None
+        self.remaining_minutes: int | None = None
+        self.relative_e = False
+        self.last_e = 0.0
+        self.filament = 0.0
+
+    def feed(self, data: bytes):
+        lines = (self.partial + data).split(b'\n')
+        self.partial = lines.pop()
+        for line in lines:
+            self._line(line.decode('ascii', 'ignore').strip())
+
+    def finish(self) -> LayerIndex:
+        if self.partial:
+            self._line(self.partial.decode('ascii', 'ignore').strip())
+            self.partial = b''
+        if self.total_minutes is not None:
+            self.index.total_time = self.total_minutes * 60.0
+        elif self.index.time:
+            self.index.total_time = self.index.time[-1]
+        return self.index
+
+    def _elapsed(self) -> float:
+        if self.total_minutes is None or self.remaining_minutes is None:
+            return 0.0
+        return (self.total_minutes - self.remaining_minutes) * 60.0
+
+    def _line(self, line: str):
+        if line.startswith(';Z:'):
+            try:
+                z = float(line[3:])
+            except ValueError:
+                return
+            self.index.z.append(z)
+            self.index.time.append(self._elapsed())
+            self.index.filament.append(self.filament)
+            return
+        code = line.split(';', 1)[0]
+        if not code:
+            return
+        if code.startswith(('G1', 'G0', 'G2', 'G3')) and 'E' in code:
+            if match := _E_RE.search(code):
+                e = float(match.group(1))
+                # signed, a retraction is given back by the matching unretraction
+                if self.relative_e:
+                    self.filament += e
+                else:
+                    self.filament += e - self.last_e
+                    self.last_e = e
+        elif code.startswith('M73'):
+            # normal mode only, the stealth mode one is M73 Q.. S..
+            if match := _R_RE.search(code):
+                self.remaining_minutes = int(match.group(1))
+                if self.total_minutes is None:
+                    self.total_minutes = self.remaining_minutes
+        elif code.startswith('M83'):
+            self.relative_e = True
+        elif code.startswith('M82'):
+            self.relative_e = False
+        elif code.startswith('G92') and (match := _E_RE.search(code)):
+            self.last_e = float(match.group(1))
+
+
+def build_layer_index(chunks) -> LayerIndex:
+    builder = LayerIndexBuilder()
+    reader = BgcodeReader(builder.feed)
+    for chunk in chunks:
+        reader.feed(chunk)
+    return builder.finish()
+
+
+class LayerIndexStore:
+    """Layer tables by file hash, a file is only ever downloaded and parsed once"""
+
+    def __init__(self, client, root: Path):
+        self.client = client
+        self.root = Path(root)
+        self._memory: dict[str, LayerIndex] = {}
+        self._building: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, printer: str, file_hash: str) -> LayerIndex:
+        with self._lock:
+            if file_hash in self._memory:
+                return self._memory[file_hash]
+            building = self._building.setdefault(file_hash, threading.Lock())
+        # one download per hash, lookups of other hashes never wait for it
+        with building:
+            with self._lock:
+                if file_hash in self._memory:
+                    return self._memory[file_hash]
+            index = self._load_or_build(printer, file_hash)
+            with self._lock:
+                self._memory[file_hash] = index
+                self._building.pop(file_hash, None)
+            return index
+
+    def _load_or_build(self, printer: str, file_hash: str) -> LayerIndex:
+        path = self.root / f'{file_hash}.layers'
+        if path.exists():
+            try:
+                return LayerIndex.load(path)
+            except (EOFError, ValueError):
+                # left by an older interrupted save, build it again
+                path.unlink(missing_ok=True)
+        index = build_layer_index(self.client.iter_file(printer, file_hash))
+        index.save(path)
+        return index
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from textual_prusa_connect.models import Job
+
+# Jobs in one of these states are done for good, their details can never change
+FINISHED_STATES = ('FIN_OK', 'FIN_ERROR', 'FIN_STOPPED')
+
+
+class JobCache:
+    """
+    Permanent cache for finished jobs.
+
+    Job payloads are stored once under `objects/<sha256>` and `jobs/<id>` holds
+    the digest of the payload for that job id.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.objects = self.root / 'objects'
+        self.index = self.root / 'jobs'
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.index.mkdir(parents=True, exist_ok=True)
+        self._memory: dict[int, Job] = {}
+        self._lock = threading.Lock()
+
+    def get(self, job_id: int) -> Job | None:
+        with self._lock:
+            if job_id in self._memory:
+                return self._memory[job_id]
+        try:
+            digest = (self.index / str(job_id)).read_text().strip()
+            job = Job.model_validate_json((self.objects / digest).read_bytes())
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._memory[job_id] = job
+        return job
+
+    def put(self, job: Job) -> bool:
+        """Store `job` if it is finished, returns whether it was cached"""
+        if job.state not in FINISHED_STATES:
+            return False
+        payload = json.dumps(job.model_dump(mode='json'), sort_keys=True).encode()
+        digest = hashlib.sha256(payload).hexdigest()
+        blob = self.objects / digest
+        if not blob.exists():
+            self._write(blob, payload)
+        self._write(self.index / str(job.id), digest.encode())
+        with self._lock:
+            self._memory[job.id] = job
+        return True
+
+    @staticmethod
+    def _write(path: Path, data: bytes):
+        # write then rename so a crash never leaves a half written entry behind
+        tmp = path.with_name(f'.{path.name}.{threading.get_ident()}.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
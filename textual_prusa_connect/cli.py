@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from rich import print
+
+from textual_prusa_connect.commands import CANCEL_PRINTER_READY, SET_PRINTER_READY, CommandResult, dispatch_command
+from textual_prusa_connect.config import AppSettings
+from textual_prusa_connect.connect_api import PrusaConnectAPI
+from textual_prusa_connect.export import PAGE_SIZE, WRITERS, export_jobs
+from textual_prusa_connect.telemetry import TelemetryArchive, export_telemetry
+from textual_prusa_connect.version import __version__
+
+
+def make_client(settings: AppSettings, max_workers: int = 8) -> PrusaConnectAPI:
+    headers = {
+        'cookie': f'SESSID="{settings.session_id}"',
+        'User-Agent': f"textual-prusa-connect/{__version__}"
+    }
+    return PrusaConnectAPI(headers, base_url=settings.base_url, max_workers=max_workers)
+
+
+def cmd_ready(args, client: PrusaConnectAPI) -> int:
+    printers = args.printers or [printer.uuid.get_secret_value() for printer in client.get_printers()]
+    command = CANCEL_PRINTER_READY if args.cancel else SET_PRINTER_READY
+
+    def progress(result: CommandResult):
+        color = 'green' if result.status == 'acked' else 'red'
+        print(f'{result.printer}: [{color}]{result.status}[/] {result.state or ""} '
+              f'{result.error or ""} ({result.elapsed:.1f}s)')
+
+    report = dispatch_command(client, printers, command, timeout=args.timeout, progress=progress)
+    print(report.summary())
+    return 0 if report.ok else 1
+
+
+def cmd_export_jobs(args, client: PrusaConnectAPI) -> int:
+    count = export_jobs(client, args.output, fmt=args.format, page_size=args.page_size)
+    print(f'{count} jobs exported to {args.output}')
+    return 0
+
+
+def cmd_export_telemetry(args, client: PrusaConnectAPI) -> int:
+    archive = TelemetryArchive(args.archive or AppSettings().cache_dir / 'telemetry')
+    printers = [args.printer] if args.printer else archive.printers()
+    if not printers:
+        print('[red]no telemetry recorded yet[/]')
+        return 1
+    if len(printers) > 1:
+        print(f'[red]several printers recorded, pick one of:[/] {" ".join(printers)}')
+        return 1
+    start = int(args.start.timestamp()) if args.start else 0
+    end = int(args.end.timestamp()) if args.end else None
+    count = export_telemetry(archive, printers[0], args.output, start, end)
+    print(f'{count} samples exported to {args.output}')
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='prusa-connect')
+    parser.add_argument('--workers', type=int, default=8, help='concurrent requests')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ready = commands.add_parser('ready', help='mark printers ready after a plate change')
+    ready.add_argument('printers', nargs='*', help='printer uuids, every printer when omitted')
+    ready.add_argument('--cancel', action='store_true', help='cancel the ready state instead')
+    ready.add_argument('--timeout', type=float, default=60, help='seconds to wait for each printer')
+    ready.set_defaults(func=cmd_ready)
+
+    export = commands.add_parser('export-jobs', help='export the job history')
+    export.add_argument('output', type=Path)
+    export.add_argument('--format', choices=list(WRITERS), help='guessed from the output suffix by default')
+    export.add_argument('--page-size', type=int, default=PAGE_SIZE)
+    export.set_defaults(func=cmd_export_jobs)
+
+    telemetry = commands.add_parser('export-telemetry', help='export the recorded telemetry to CSV')
+    telemetry.add_argument('output', type=Path)
+    telemetry.add_argument('--printer', help='printer uuid, required when several printers were recorded')
+    telemetry.add_argument('--start', type=datetime.fromisoformat, help='ISO date or datetime')
+    telemetry.add_argument('--end', type=datetime.fromisoformat, help='ISO date or datetime')
+    telemetry.add_argument('--archive', type=Path, help='telemetry directory, inside the cache dir by default')
+    telemetry.set_defaults(func=cmd_export_telemetry)
+
+    args = parser.parse_args(argv)
+    client = make_client(AppSettings(), max_workers=args.workers)
+    return args.func(args, client)
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
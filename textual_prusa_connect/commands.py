@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import heapq
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Literal
+
+from textual_prusa_connect.connect_api import ApiError, PrusaConnectAPI
+from textual_prusa_connect.transport import TRANSPORT_ERRORS
+
+SET_PRINTER_READY = 'SET_PRINTER_READY'
+CANCEL_PRINTER_READY = 'CANCEL_PRINTER_READY'
+
+# How to tell from its state that a printer applied the command
+ACKNOWLEDGED: dict[str, Callable[[str], bool]] = {
+    SET_PRINTER_READY: lambda state: state == 'READY',
+    CANCEL_PRINTER_READY: lambda state: state != 'READY',
+}
+
+COMMAND_ERRORS = (*TRANSPORT_ERRORS, ApiError)
+
+
+@dataclass
+class CommandResult:
+    printer: str
+    status: Literal['acked', 'timeout', 'error'] = 'timeout'
+    state: str | None = None
+    elapsed: float = 0.0
+    error: str | None = None
+
+
+@dataclass
+class CommandReport:
+    command: str
+    results: list[CommandResult] = field(default_factory=list)
+
+    def by_status(self, status: str) -> list[CommandResult]:
+        return [result for result in self.results if result.status == status]
+
+    @property
+    def ok(self) -> bool:
+        return all(result.status == 'acked' for result in self.results)
+
+    def summary(self) -> str:
+        acked, timeout, error = (len(self.by_status(status)) for status in ('acked', 'timeout', 'error'))
+        return f'{self.command}: {acked}/{len(self.results)} acknowledged, {timeout} timed out, {error} failed'
+
+
+def dispatch_command(client: PrusaConnectAPI, printers: list[str], command: str, timeout: float = 60,
+                     poll_interval: float = 2, max_workers: int | None = None,
+                     progress: Callable[[CommandResult], None] | None = None) -> CommandReport:
+    """
+    Send `command` to every printer, at most `max_workers` requests in flight, then watch each
+    printer state until it acknowledged the command or `timeout` expired.
+    Each printer runs its own send then poll cycle, a slow printer only delays itself and a
+    hung request is given up on at the printer deadline.
+    """
+    acknowledged = ACKNOWLEDGED.get(command, lambda state: True)
+    results = {printer: CommandResult(printer) for printer in printers}
+    started: dict[str, float] = {}
+    pending = set(printers)
+
+    def finish(result: CommandResult, status: str | None = None):
+        if status:
+            result.status = status
+        pending.discard(result.printer)
+        if progress:
+            progress(result)
+
+    def send(printer: str):
+        started[printer] = time.monotonic()
+        client.set_sync(printer, command)
+
+    def check(printer: str) -> str | None:
+        current = client.get_printer(printer)
+        return current.printer_state if current is not None else None
+
+    pool = ThreadPoolExecutor(max_workers=max_workers or client.max_workers)
+    running: dict[Future, tuple[str, str]] = {pool.submit(send, printer): (printer, 'send') for printer in printers}
+    # (when, printer) of the next state checks
+    scheduled: list[tuple[float, str]] = []
+    try:
+        while pending:
+            now = time.monotonic()
+            for printer in [printer for printer in pending if printer in started]:
+                if now - started[printer] >= timeout:
+                    results[printer].elapsed = now - started[printer]
+                    finish(results[printer])
+            while scheduled and scheduled[0][0] <= now:
+                _, printer = heapq.heappop(scheduled)
+                if printer in pending:
+                    running[pool.submit(check, printer)] = (printer, 'check')
+            if not pending:
+                break
+
+            wakeups = [started[printer] + timeout for printer in pending if printer in started]
+            if scheduled:
+                wakeups.append(scheduled[0][0])
+            wait_for = max(min(wakeups) - now, 0) if wakeups else None
+            if not running:
+                time.sleep(wait_for or 0)
+                continue
+            done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                printer, step = running.pop(future)
+                if printer not in pending:
+                    # already timed out
+                    continue
+                result = results[printer]
+                try:
+                    state = future.result()
+                except COMMAND_ERRORS as e:
+                    if step == 'send':
+                        result.error = str(e)
+                        finish(result, 'error')
+                        continue
+                    # transient, try again next round
+                    state = None
+                if step == 'check' and state is not None:
+                    result.state = state
+                    result.elapsed = time.monotonic() - started[printer]
+                    if acknowledged(state):
+                        finish(result, 'acked')
+                        continue
+                delay = poll_interval if step == 'check' else 0
+                heapq.heappush(scheduled, (time.monotonic() + delay, printer))
+    finally:
+        # requests given up on finish in the background, bounded by the client timeout
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return CommandReport(command, [results[printer] for printer in printers])
@@ -1,5 +1,9 @@
 from __future__ import annotations
 
+from pathlib import Path
+from typing import Literal
+
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,3 +12,14 @@ class AppSettings(BaseSettings):
 
     printer_uuid: str
     session_id: str
+    base_url: str = 'https://connect.prusa3d.com/app/'
+    log_level: Literal['debug', 'info', 'warning', 'error'] = 'info'
+    # [[start, end], ...] unix timestamps
+    maintenance_windows: list[tuple[int, int]] = []
+    cache_dir: Path = Path.home() / '.cache' / 'textual-prusa-connect'
+
+    @field_validator('log_level', mode='before')
+    @classmethod
+    def lowercase_level(cls, value):
+        # LOG_LEVEL=INFO is the usual spelling
+        return value.lower() if isinstance(value, str) else value
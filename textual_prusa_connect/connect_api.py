@@ -1,15 +1,28 @@
 from __future__ import annotations
 
-from requests import Session
+from concurrent.futures import ThreadPoolExecutor
 
-from textual_prusa_connect.models import Event, File, Job, Printer, FirmwareFile, PrintFile
+from textual_prusa_connect.cache import JobCache
+from textual_prusa_connect.models import Camera, Event, File, Job, Printer, FirmwareFile, PrintFile
+from textual_prusa_connect.transport import (
+    TRANSPORT_ERRORS, TransportStats, body_kwargs, head_sizes, http_version, iter_chunks, make_session, stream, wire_size,
+)
 
 
-class ResourceNotFound(Exception):
+class ApiError(Exception):
+    """Any HTTP error status, whichever HTTP client sent the request"""
+
+    def __init__(self, status: int, text: str = ''):
+        super().__init__(f"{status}: {text}")
+        self.status = status
+        self.text = text
+
+
+class ResourceNotFound(ApiError):
     ...
 
 
-class Unauthorized(Exception):
+class Unauthorized(ApiError):
     ...
 
 
@@ -17,52 +30,130 @@ class Wtf(Exception):
     ...
 
 
+# seconds, a hung request must not hold a worker forever
+REQUEST_TIMEOUT = 30
+
+
 class PrusaConnectAPI:
-    def __init__(self, headers: dict[str, str]):
-        self.base_url = "https://connect.prusa3d.com/app/"
-        self.session = Session()
-        self.session.headers.update(headers)
+    def __init__(self, headers: dict[str, str], job_cache: JobCache | None = None, max_workers: int = 8,
+                 http2: bool = True, base_url: str = "https://connect.prusa3d.com/app/",
+                 timeout: float = REQUEST_TIMEOUT):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = make_session(headers, http2=http2)
+        self.stats = TransportStats()
+        self.job_cache = job_cache
+        self.max_workers = max_workers
+
+    def _request(self, method: str, url: str, body: bytes | None = None, **kwargs):
+        if body is not None:
+            kwargs.update(body_kwargs(self.session, body))
+        kwargs.setdefault('timeout', self.timeout)
+        response = self.session.request(method, url, **kwargs)
+        self.stats.record(response)
+        return response
+
+    def _get(self, url: str):
+        return self._request('GET', url)
+
+    @staticmethod
+    def _raise_for_status(response):
+        if response.status_code < 400:
+            return
+        if response.status_code == 404:
+            raise ResourceNotFound(response.status_code, response.text)
+        elif response.status_code in (401, 403):
+            raise Unauthorized(response.status_code, response.text)
+        raise ApiError(response.status_code, response.text)
 
     def get_printers(self) -> list[Printer]:
-        response = self.session.get(self.base_url + "printers")
-        if response.ok:
+        response = self._get(self.base_url + "printers")
+        if response.status_code < 400:
             return [Printer(**r) for r in response.json()['printers']]
 
     def get_printer(self, printer_id) -> Printer | None:
-        response = self.session.get(f"{self.base_url}printers/{printer_id}")
-        if response.ok:
+        response = self._get(f"{self.base_url}printers/{printer_id}")
+        if response.status_code < 400:
             return Printer(**response.json())
         elif response.status_code == 404:
-            raise ResourceNotFound(f"{response.status_code}: {response.text}")
+            raise ResourceNotFound(response.status_code, response.text)
         elif response.status_code in (401, 403):
-            raise Unauthorized(f"{response.status_code}: {response.text}")
+            raise Unauthorized(response.status_code, response.text)
         return None
 
-    def get_storage(self):
-        ...
+    def get_storage(self, printer: str) -> list[dict]:
+        response = self._get(f'{self.base_url}printers/{printer}/storages')
+        if response.status_code >= 400:
+            return []
+        return response.json().get('storages', [])
 
-    def get_cameras(self):
-        ...
+    def get_cameras(self, printer: str) -> list[Camera]:
+        response = self._get(f'{self.base_url}printers/{printer}/cameras')
+        if response.status_code >= 400:
+            return []
+        return [Camera(**camera) for camera in response.json().get('cameras', [])]
+
+    def get_snapshot(self, camera_id: int) -> bytes | None:
+        response = self._get(f'{self.base_url}cameras/{camera_id}/snapshots/last')
+        if response.status_code >= 400:
+            return None
+        return response.content
 
     def get_config(self):
         ...
 
     def get_files(self, printer: str | None = None, limit: int = 1) -> list[File]:
         retval = []
-        for file in self.session.get(f'{self.base_url}printers/{printer}/files?limit={limit}').json()['files']:
+        for file in self._get(f'{self.base_url}printers/{printer}/files?limit={limit}').json()['files']:
             if file['type'] == 'FIRMWARE':
                 retval.append(FirmwareFile(**file))
             elif file['type'] == 'PRINT_FILE':
                 retval.append(PrintFile(**file))
         return retval
 
+    def create_upload(self, printer: str, filename: str, size: int, storage: str = '/usb') -> dict:
+        response = self._request('POST', f'{self.base_url}printers/{printer}/uploads',
+                                 json={'filename': filename, 'size': size, 'path': storage})
+        self._raise_for_status(response)
+        return response.json()
+
+    def get_upload(self, upload_id: str) -> dict:
+        response = self._get(f'{self.base_url}uploads/{upload_id}')
+        self._raise_for_status(response)
+        return response.json()
+
+    def put_upload_chunk(self, upload_id: str, chunk: bytes, start: int, total: int) -> int:
+        """Send `chunk` at offset `start`, returns the offset the server expects next"""
+        end = start + len(chunk) - 1
+        response = self._request('PUT', f'{self.base_url}uploads/{upload_id}', body=chunk,
+                                 headers={'Content-Range': f'bytes {start}-{end}/{total}',
+                                          'Content-Type': 'application/octet-stream'})
+        # 409: the server has a different offset than we thought, resume from its offset
+        if response.status_code != 409:
+            self._raise_for_status(response)
+        return response.json()['offset']
+
+    def iter_file(self, printer: str, file_hash: str, chunk_size: int = 64 * 1024):
+        """Stream the content of a printer file"""
+        url = f'{self.base_url}printers/{printer}/files/{file_hash}/raw'
+        with stream(self.session, url, self.timeout) as response:
+            if response.status_code >= 400:
+                if hasattr(response, 'read'):
+                    response.read()
+                self._raise_for_status(response)
+            decoded = 0
+            for chunk in iter_chunks(response, chunk_size):
+                decoded += len(chunk)
+                yield chunk
+            self.stats.add(url, wire_size(response), decoded, *head_sizes(response), version=http_version(response))
+
     def get_queue(self):
         ...
 
     def get_events(self, printer: str | None = None, limit: int = 5) -> list[Event]:
         retval = []
         try:
-            for event in self.session.get(f'{self.base_url}printers/{printer}/events?limit={limit}').json()['events']:
+            for event in self._get(f'{self.base_url}printers/{printer}/events?limit={limit}').json()['events']:
                 retval.append(Event(**event))
         except KeyError:
             retval = []
@@ -79,22 +170,56 @@ class PrusaConnectAPI:
         ...
 
     def get_login(self):
-        return self.session.get(f'{self.base_url}login')
+        return self._get(f'{self.base_url}login')
 
     def get_jobs(self, limit: int = 5, offset: int = 0) -> list[Job]:
         retval = []
         # other = 'state=FIN_OK&state=FIN_ERROR&state=FIN_STOPPED&state=UNKNOWN'
-        for result in self.session.get(f'{self.base_url}jobs?limit={limit}&offset={offset}').json()['jobs']:
+        for result in self._get(f'{self.base_url}jobs?limit={limit}&offset={offset}').json()['jobs']:
             retval.append(Job(**result))
         return retval
 
+    def get_job(self, job_id: int) -> Job:
+        if self.job_cache and (job := self.job_cache.get(job_id)):
+            return job
+        response = self._get(f'{self.base_url}jobs/{job_id}')
+        self._raise_for_status(response)
+        job = Job(**response.json())
+        if self.job_cache:
+            self.job_cache.put(job)
+        return job
+
+    def get_jobs_details(self, job_ids: list[int], max_workers: int | None = None) -> dict[int, Job | Exception]:
+        """
+        Fetch the details of many jobs, at most `max_workers` requests in flight at once.
+        A job that failed to load maps to its exception, only loaded jobs are cached.
+        """
+        retval: dict[int, Job | Exception] = {}
+        missing = []
+        for job_id in job_ids:
+            if self.job_cache and (job := self.job_cache.get(job_id)):
+                retval[job_id] = job
+            else:
+                missing.append(job_id)
+        if missing:
+            with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as pool:
+                futures = {job_id: pool.submit(self.get_job, job_id) for job_id in missing}
+            for job_id, future in futures.items():
+                try:
+                    retval[job_id] = future.result()
+                except (*TRANSPORT_ERRORS, ApiError, ValueError) as e:
+                    retval[job_id] = e
+        return {job_id: retval[job_id] for job_id in job_ids}
+
     def get_groups(self):
         ...
 
     def get_invitations(self):
         ...
 
-    def set_sync(self):
+    def set_sync(self, printer: str, command: str) -> dict:
         # {command: "SET_PRINTER_READY"}
         # {command: "CANCEL_PRINTER_READY"}
-        ...
+        response = self._request('POST', f'{self.base_url}printers/{printer}/commands/sync', json={'command': command})
+        self._raise_for_status(response)
+        return response.json() if response.content else {}
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import csv
+import json
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+from textual_prusa_connect.connect_api import PrusaConnectAPI
+from textual_prusa_connect.models import Job
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+PAGE_SIZE = 100
+
+# file.meta fields worth keeping, with the type they are coerced to
+META_FIELDS = {
+    'filament_type': str,
+    'filament_used_g': float,
+    'filament_used_m': float,
+    'filament_cost': float,
+    'estimated_print_time': float,
+    'printer_model': str,
+    'nozzle_diameter': float,
+    'layer_height': float,
+}
+COLUMNS = ['id', 'printer_uuid', 'state', 'source', 'path', 'start', 'end', 'duration', 'file_name',
+           'file_size', *(f'meta_{name}' for name in META_FIELDS)]
+
+
+def iter_job_pages(client: PrusaConnectAPI, page_size: int = PAGE_SIZE, prefetch: int = 2) -> Iterator[list[Job]]:
+    """
+    Yield pages of jobs, the next pages are fetched in a background thread while the
+    current one is consumed. At most `prefetch` pages wait in memory.
+    """
+    pages: queue.Queue = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    done = object()
+
+    def fetch():
+        offset = 0
+        try:
+            while not stop.is_set():
+                page = client.get_jobs(limit=page_size, offset=offset)
+                pages.put(page)
+                if len(page) < page_size:
+                    break
+                offset += page_size
+        except Exception as e:
+            pages.put(e)
+        pages.put(done)
+
+    thread = threading.Thread(target=fetch, name='job-pages', daemon=True)
+    thread.start()
+    try:
+        while (page := pages.get()) is not done:
+            if isinstance(page, Exception):
+                raise page
+            if page:
+                yield page
+    finally:
+        stop.set()
+        # unblock the producer if it is waiting on a full queue
+        while thread.is_alive():
+            try:
+                pages.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def _coerce(value: Any, kind: type) -> Any:
+    if value is None:
+        return None
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def flatten_job(job: Job) -> dict[str, Any]:
+    meta = job.file.meta or {}
+    end = job.end if job.end not in (None, -1) else None
+    row = {
+        'id': job.id,
+        'printer_uuid': job.printer_uuid,
+        'state': job.state,
+        'source': job.source,
+        'path': job.path,
+        'start': job.start,
+        'end': end,
+        'duration': end - job.start if end else None,
+        'file_name': job.file.name,
+        'file_size': job.file.size,
+    }
+    for name, kind in META_FIELDS.items():
+        row[f'meta_{name}'] = _coerce(meta.get(name), kind)
+    return row
+
+
+class CsvWriter:
+    def __init__(self, path: Path):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, rows: list[dict]):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlWriter:
+    def __init__(self, path: Path):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, rows: list[dict]):
+        self.file.writelines(json.dumps(row) + '\n' for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """One row group per page"""
+
+    def __init__(self, path: Path):
+        if pyarrow is None:
+            raise RuntimeError('Parquet export requires pyarrow')
+        types = {'id': pyarrow.int64(), 'start': pyarrow.int64(), 'end': pyarrow.int64(),
+                 'duration': pyarrow.int64(), 'file_size': pyarrow.int64()}
+        types.update({f'meta_{name}': pyarrow.float64() for name, kind in META_FIELDS.items() if kind is float})
+        self.schema = pyarrow.schema([(column, types.get(column, pyarrow.string())) for column in COLUMNS])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, rows: list[dict]):
+        self.writer.write_table(pyarrow.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {'csv': CsvWriter, 'jsonl': JsonlWriter, 'parquet': ParquetWriter}
+
+
+def export_jobs(client: PrusaConnectAPI, path: Path, fmt: str | None = None, page_size: int = PAGE_SIZE) -> int:
+    """Stream the whole job history to `path`, returns the number of exported jobs"""
+    path = Path(path)
+    fmt = fmt or path.suffix.lstrip('.')
+    if fmt not in WRITERS:
+        raise ValueError(f'Unknown export format {fmt!r}, expected one of {", ".join(WRITERS)}')
+    writer = WRITERS[fmt](path)
+    count = 0
+    try:
+        for page in iter_job_pages(client, page_size):
+            writer.write([flatten_job(job) for job in page])
+            count += len(page)
+    finally:
+        writer.close()
+    return count
@@ -59,13 +59,13 @@ class Job(BaseModel):
     origin_id: int
     path: str
     state: str
-    # hash: str
+    hash: Optional[str] = None
     # team_id: int
     start: int
     end: Optional[int] = -1
     source: str
-    # source_info: dict
-    # planned: dict
+    source_info: Optional[dict] = None
+    planned: Optional[dict] = None
     file: 'File'
 
 
@@ -80,7 +80,7 @@ class File(BaseModel):
     uploaded: Optional[int] = None
     meta: Optional[dict] = {}
     # 'read_only': False,
-    # 'hash': 'yUbtnfNt9Ju2yVwvjIRp4gxZ5ik.',
+    hash: Optional[str] = None
     # 'display_path': '/usb/NTS1StandB_0.4n_0.2mm_PLA_XLIS_1h1m.bgcode',
     # 'team_id': 26502,
     sync: dict
@@ -104,6 +104,13 @@ class Tool(BaseModel):
     fan_print: float
 
 
+class Camera(BaseModel):
+    id: int
+    name: Optional[str] = None
+    origin: Optional[str] = None
+    config: Optional[dict] = {}
+
+
 class Event(BaseModel):
     event: str
     created: datetime.datetime
@@ -0,0 +1,191 @@
+"""
+Append-only telemetry archive, one directory per printer holding `time.i8` (unix timestamps)
+and one `<metric>.f8` column per metric, all fixed width so sample `i` sits at offset `i * 8`.
+Columns are written before the time index, a sample only exists once its timestamp is written.
+"""
+from __future__ import annotations
+
+import csv
+import math
+import mmap
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+METRICS = {
+    'temp_nozzle': ('temp', 'temp_nozzle'),
+    'target_nozzle': ('temp', 'target_nozzle'),
+    'temp_bed': ('temp', 'temp_bed'),
+    'target_bed': ('temp', 'target_bed'),
+    'axis_z': ('axis_z',),
+    'speed': ('speed',),
+    'flow': ('flow',),
+    'progress': ('job_info', 'progress'),
+}
+TIME_FILE = 'time.i8'
+
+
+def sample(printer: Any) -> list[float]:
+    values = []
+    for path in METRICS.values():
+        value = printer
+        for part in path:
+            value = value.get(part) if isinstance(value, dict) else getattr(value, part, None)
+            if value is None:
+                break
+        values.append(float(value) if isinstance(value, (int, float)) else math.nan)
+    return values
+
+
+class TelemetryArchive:
+    def __init__(self, root: Path, batch_size: int = 12):
+        self.root = Path(root)
+        self.batch_size = batch_size
+        self._pending: dict[str, list[tuple[int, list[float]]]] = defaultdict(list)
+        self._last: dict[str, int] = {}
+
+    def _last_timestamp(self, printer_id: str) -> int:
+        if printer_id not in self._last:
+            last = 0
+            try:
+                with (self.root / printer_id / TIME_FILE).open('rb') as f:
+                    size = f.seek(0, 2) // 8 * 8
+                    if size:
+                        f.seek(size - 8)
+                        last = array('q', f.read(8))[0]
+            except OSError:
+                pass
+            self._last[printer_id] = last
+        return self._last[printer_id]
+
+    def append(self, printer_id: str, printer: Any, timestamp: int | None = None):
+        timestamp = int(time.time()) if timestamp is None else timestamp
+        # the time index must stay sorted for bisect, drop samples from before a clock change
+        if timestamp < self._last_timestamp(printer_id):
+            return
+        self._last[printer_id] = timestamp
+        pending = self._pending[printer_id]
+        pending.append((timestamp, sample(printer)))
+        if len(pending) >= self.batch_size:
+            self.flush(printer_id)
+
+    def flush(self, printer_id: str | None = None):
+        for printer in [printer_id] if printer_id else list(self._pending):
+            pending = self._pending.pop(printer, [])
+            if not pending:
+                continue
+            directory = self.root / printer
+            directory.mkdir(parents=True, exist_ok=True)
+            time_file = directory / TIME_FILE
+            committed = time_file.stat().st_size // 8 * 8 if time_file.exists() else 0
+            for i, metric in enumerate(METRICS):
+                with (directory / f'{metric}.f8').open('ab') as f:
+                    # drop whatever an interrupted flush left past the time index
+                    if f.tell() != committed:
+                        f.truncate(committed)
+                    array('d', [values[i] for _, values in pending]).tofile(f)
+            with time_file.open('ab') as f:
+                if f.tell() != committed:
+                    f.truncate(committed)
+                array('q', [timestamp for timestamp, _ in pending]).tofile(f)
+
+    def pending(self, printer_id: str) -> list[tuple[int, list[float]]]:
+        """Samples not flushed yet, in `METRICS` order"""
+        return list(self._pending.get(printer_id, []))
+
+    def printers(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return sorted(path.name for path in self.root.iterdir() if (path / TIME_FILE).exists())
+
+    def open(self, printer_id: str) -> TelemetryReader:
+        return TelemetryReader(self.root / printer_id)
+
+
+class TelemetryReader:
+    """
+    Memory mapped view of a printer archive, queries return zero copy slices so only the
+    pages of the requested time range are ever read. Use as a context manager and copy what
+    must outlive it.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._maps: list[mmap.mmap] = []
+        self._views: list[memoryview] = []
+        self.times = self._map(TIME_FILE, 'q')
+        self.length = len(self.times)
+        self.columns: dict[str, memoryview] = {}
+
+    def _map(self, name: str, fmt: str) -> memoryview:
+        try:
+            with (self.directory / name).open('rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # missing or empty file
+            return memoryview(array(fmt))
+        self._maps.append(mapped)
+        usable = len(mapped) - len(mapped) % 8
+        view = memoryview(mapped)[:usable].cast(fmt)
+        self._views.append(view)
+        return view
+
+    def column(self, metric: str):
+        if metric not in self.columns:
+            self.columns[metric] = self._map(f'{metric}.f8', 'd')
+        return self.columns[metric]
+
+    def range(self, start: int, end: int) -> tuple[int, int]:
+        """Sample indexes covering [start, end]"""
+        return bisect_left(self.times, start, 0, self.length), bisect_right(self.times, end, 0, self.length)
+
+    def query(self, metric: str, start: int, end: int) -> tuple[memoryview, memoryview]:
+        """Timestamps and values in [start, end], release both before closing the reader"""
+        lo, hi = self.range(start, end)
+        return self.times[lo:hi], self.column(metric)[lo:hi]
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._views.clear()
+        self._maps.clear()
+
+    def __enter__(self) -> TelemetryReader:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def downsample(values, width: int) -> list[float]:
+    """Mean of `width` equal buckets, NaN samples are ignored"""
+    if not len(values) or width <= 0:
+        return []
+    step = max(len(values) / width, 1)
+    retval = []
+    for bucket in range(min(width, len(values))):
+        chunk = [v for v in values[int(bucket * step):int((bucket + 1) * step)] if not math.isnan(v)]
+        retval.append(sum(chunk) / len(chunk) if chunk else 0.0)
+    return retval
+
+
+def export_telemetry(archive: TelemetryArchive, printer_id: str, output: Path,
+                     start: int = 0, end: int | None = None) -> int:
+    """Stream [start, end] of a printer archive to CSV, one row per sample"""
+    end = int(time.time()) if end is None else end
+    with archive.open(printer_id) as reader, Path(output).open('w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['timestamp', 'time', *METRICS])
+        lo, hi = reader.range(start, end)
+        columns = [reader.column(metric) for metric in METRICS]
+        for i in range(lo, hi):
+            timestamp = reader.times[i]
+            writer.writerow([timestamp, datetime.fromtimestamp(timestamp).isoformat(),
+                             *('' if math.isnan(column[i]) else column[i] for column in columns)])
+    return hi - lo
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from functools import lru_cache
+from itertools import accumulate
+from typing import Iterable
+
+from textual_prusa_connect.models import Job
+
+# bucket size in seconds of each zoom level
+ZOOM_LEVELS = [3600, 6 * 3600, 86400, 7 * 86400, 30 * 86400]
+
+
+class IntervalIndex:
+    """
+    Static index over [start, end) intervals. Intervals are sorted by start and keep the running
+    maximum of their ends, an overlap query is two bisections plus the matching intervals.
+    """
+
+    def __init__(self, intervals: Iterable[tuple[int, int]]):
+        intervals = sorted(intervals)
+        self.starts = [start for start, _ in intervals]
+        self.ends = [end for _, end in intervals]
+        self.max_ends = list(accumulate(self.ends, max))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlapping(self, lo: int, hi: int) -> range:
+        """Indexes of the intervals that may overlap [lo, hi), filter with `ends[i] > lo`"""
+        right = bisect_left(self.starts, hi)
+        left = bisect_right(self.max_ends, lo, 0, right)
+        return range(left, right)
+
+
+class PrinterTimeline:
+    def __init__(self, jobs: list[Job], now: int | None = None):
+        now = int(time.time()) if now is None else now
+
+        def span(job: Job) -> tuple[int, int]:
+            return job.start, job.end if job.end not in (None, -1) else now
+        # same order as the index sorts its intervals, index positions are job positions
+        self.jobs = sorted(jobs, key=span)
+        spans = [span(job) for job in self.jobs]
+        self.index = IntervalIndex(spans)
+
+        # A printer runs one job at a time, busy time is measured on the union of the jobs
+        merged: list[list[int]] = []
+        for start, end in sorted(spans):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.busy_starts = [start for start, _ in merged]
+        self.busy_ends = [end for _, end in merged]
+        self.busy_prefix = [0, *accumulate(end - start for start, end in merged)]
+        self.bucket_busy = lru_cache(maxsize=8192)(self._bucket_busy)
+
+    @property
+    def first(self) -> int | None:
+        return self.busy_starts[0] if self.busy_starts else None
+
+    def jobs_between(self, lo: int, hi: int) -> list[Job]:
+        return [self.jobs[i] for i in self.index.overlapping(lo, hi) if self.index.ends[i] > lo]
+
+    def busy(self, lo: int, hi: int) -> int:
+        """Seconds spent printing in [lo, hi), O(log n)"""
+        first = bisect_right(self.busy_ends, lo)
+        last = bisect_left(self.busy_starts, hi)
+        if first >= last:
+            return 0
+        total = self.busy_prefix[last] - self.busy_prefix[first]
+        total -= max(0, lo - self.busy_starts[first])
+        total -= max(0, self.busy_ends[last - 1] - hi)
+        return total
+
+    def utilization(self, lo: int, hi: int) -> float:
+        return self.busy(lo, hi) / (hi - lo) if hi > lo else 0.0
+
+    def idle_gaps(self, lo: int, hi: int) -> list[tuple[int, int]]:
+        gaps = []
+        cursor = lo
+        first = bisect_right(self.busy_ends, lo)
+        last = bisect_left(self.busy_starts, hi)
+        for start, end in zip(self.busy_starts[first:last], self.busy_ends[first:last]):
+            if start > cursor:
+                gaps.append((cursor, start))
+            cursor = max(cursor, end)
+        if cursor < hi:
+            gaps.append((cursor, hi))
+        return gaps
+
+    def maintenance_overlap(self, windows: list[tuple[int, int]]) -> int:
+        """Seconds of printing that fell inside maintenance windows"""
+        return sum(self.busy(start, end) for start, end in windows)
+
+    def _bucket_busy(self, level: int, bucket: int) -> int:
+        return self.busy(bucket * level, (bucket + 1) * level)
+
+    def buckets(self, level: int, lo: int, count: int) -> list[float]:
+        """Utilization of `count` buckets of `level` seconds starting at the bucket holding `lo`"""
+        first = lo // level
+        return [self.bucket_busy(level, bucket) / level for bucket in range(first, first + count)]
+
+
+def build_timelines(jobs: Iterable[Job], now: int | None = None) -> dict[str, PrinterTimeline]:
+    by_printer: dict[str, list[Job]] = defaultdict(list)
+    for job in jobs:
+        by_printer[job.printer_uuid].append(job)
+    return {printer: PrinterTimeline(printer_jobs, now) for printer, printer_jobs in by_printer.items()}
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from requests import RequestException, Session
+
+try:
+    import httpx
+    import h2  # noqa: F401 httpx only speaks HTTP/2 when h2 is installed
+except ImportError:
+    httpx = None
+
+TRANSPORT_ERRORS: tuple[type[Exception], ...] = (RequestException,)
+if httpx is not None:
+    TRANSPORT_ERRORS += (httpx.TransportError,)
+
+_ID_RE = re.compile(r'/(?:[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}|[0-9a-fA-F]{32,}|\d+)(?=/|$)')
+
+
+def accept_encoding() -> str:
+    encodings = ['gzip', 'deflate']
+    try:
+        import brotli  # noqa: F401
+        encodings.append('br')
+    except ImportError:
+        pass
+    return ', '.join(encodings)
+
+
+def make_session(headers: dict[str, str], http2: bool = True):
+    """
+    HTTP/2 client multiplexing every request over one connection when httpx[http2] is installed,
+    plain `requests.Session` otherwise
+    """
+    if http2 and httpx is not None:
+        session = httpx.Client(http2=True, follow_redirects=True)
+    else:
+        session = Session()
+    session.headers.update({'Accept-Encoding': accept_encoding()})
+    session.headers.update(headers)
+    return session
+
+
+def body_kwargs(session, body: bytes) -> dict:
+    """httpx and requests disagree on the name of the raw body argument"""
+    if httpx is not None and isinstance(session, httpx.Client):
+        return {'content': body}
+    return {'data': body}
+
+
+@contextmanager
+def stream(session, url: str, timeout: float | None = None):
+    """GET `url` without loading the body in memory"""
+    if httpx is not None and isinstance(session, httpx.Client):
+        # None would disable the client default timeout instead of keeping it
+        kwargs = {'timeout': timeout} if timeout is not None else {}
+        with session.stream('GET', url, **kwargs) as response:
+            yield response
+    else:
+        with session.get(url, stream=True, timeout=timeout) as response:
+            yield response
+
+
+def iter_chunks(response, chunk_size: int):
+    if hasattr(response, 'iter_bytes'):
+        return response.iter_bytes(chunk_size)
+    return response.iter_content(chunk_size)
+
+
+def endpoint(url: str) -> str:
+    """`https://host/app/printers/<uuid>/files?limit=3` -> `/app/printers/{id}/files`"""
+    return _ID_RE.sub('/{id}', urlsplit(url).path)
+
+
+def wire_size(response) -> int:
+    """Body size as transferred, before content decoding"""
+    if hasattr(response, 'num_bytes_downloaded'):
+        return response.num_bytes_downloaded
+    try:
+        return response.raw.tell()
+    except AttributeError:
+        return len(response.content)
+
+
+def _headers_size(headers) -> int:
+    # `name: value\r\n` per header plus the blank line ending the block
+    return sum(len(name) + len(value) + 4 for name, value in headers.items()) + 2
+
+
+def http_version(response) -> str:
+    if hasattr(response, 'http_version'):
+        return response.http_version
+    version = getattr(getattr(response, 'raw', None), 'version', 11)
+    return f'HTTP/{version // 10}.{version % 10}'
+
+
+def head_sizes(response) -> tuple[int, int]:
+    """
+    Approximate bytes sent (request line, headers and body) and received as status line plus
+    headers, measured as HTTP/1.1 text. HTTP/2 compresses headers with HPACK so for it these
+    are an upper bound.
+    """
+    request = response.request
+    url = urlsplit(str(request.url))
+    target = url.path + (f'?{url.query}' if url.query else '')
+    sent = len(request.method) + len(target) + len(' HTTP/1.1\r\n') + 1 + _headers_size(request.headers)
+    if 'host' not in {name.lower() for name in request.headers}:
+        # requests leaves the Host header to urllib3
+        sent += len('Host: \r\n') + len(url.netloc)
+    body = request.body if hasattr(request, 'body') else request.content
+    sent += len(body or b'')
+    reason = getattr(response, 'reason_phrase', None) or getattr(response, 'reason', None) or ''
+    received = len('HTTP/1.1 200 \r\n') + len(reason) + _headers_size(response.headers)
+    return sent, received
+
+
+@dataclass
+class EndpointStats:
+    requests: int = 0
+    # response body as transferred, before content decoding
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+    sent_bytes: int = 0
+    header_bytes: int = 0
+
+    @property
+    def ratio(self) -> float:
+        return self.wire_bytes / self.decoded_bytes if self.decoded_bytes else 1.0
+
+    @property
+    def total_bytes(self) -> int:
+        """Both directions, headers included"""
+        return self.sent_bytes + self.header_bytes + self.wire_bytes
+
+
+class TransportStats:
+    def __init__(self):
+        self.endpoints: dict[str, EndpointStats] = {}
+        self.versions: set[str] = set()
+        self._lock = threading.Lock()
+
+    def record(self, response):
+        self.add(str(response.url), wire_size(response), len(response.content), *head_sizes(response),
+                 version=http_version(response))
+
+    def add(self, url: str, wire: int, decoded: int, sent: int = 0, headers: int = 0, version: str | None = None):
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint(url), EndpointStats())
+            stats.requests += 1
+            stats.wire_bytes += wire
+            stats.decoded_bytes += decoded
+            stats.sent_bytes += sent
+            stats.header_bytes += headers
+            if version:
+                self.versions.add(version)
+
+    @property
+    def total(self) -> EndpointStats:
+        with self._lock:
+            endpoints = list(self.endpoints.values())
+        return EndpointStats(requests=sum(s.requests for s in endpoints),
+                             wire_bytes=sum(s.wire_bytes for s in endpoints),
+                             decoded_bytes=sum(s.decoded_bytes for s in endpoints),
+                             sent_bytes=sum(s.sent_bytes for s in endpoints),
+                             header_bytes=sum(s.header_bytes for s in endpoints))
+
+    def summary(self) -> str:
+        with self._lock:
+            items = sorted(self.endpoints.items(), key=lambda item: item[1].total_bytes, reverse=True)
+            versions = ', '.join(sorted(self.versions)) or 'no requests'
+        lines = [f'{versions}, header sizes as HTTP/1.1 text'
+                 + (' (upper bound under HPACK)' if any(v.startswith('HTTP/2') for v in self.versions) else '')]
+        for name, stats in items + [('total', self.total)]:
+            lines.append(f'{name}: {stats.requests} requests, {stats.total_bytes} bytes total, '
+                         f'{stats.sent_bytes} sent, {stats.header_bytes} response headers, '
+                         f'{stats.wire_bytes} body bytes on the wire, '
+                         f'{stats.decoded_bytes} decoded ({stats.ratio:.0%})')
+        return '\n'.join(lines)
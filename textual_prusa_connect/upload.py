@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import mmap
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from textual_prusa_connect.connect_api import ApiError, PrusaConnectAPI, ResourceNotFound
+from textual_prusa_connect.transport import TRANSPORT_ERRORS
+
+CHUNK_SIZE = 4 * 1024 * 1024
+RETRIES = 5
+
+
+@dataclass
+class UploadProgress:
+    printer: str
+    path: Path
+    sent: int
+    total: int
+    started: float
+    resumed_from: int = 0
+
+    @property
+    def done(self) -> bool:
+        return self.sent >= self.total
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second sent by this session"""
+        elapsed = time.monotonic() - self.started
+        return (self.sent - self.resumed_from) / elapsed if elapsed > 0 else 0.0
+
+
+ProgressCallback = Callable[[UploadProgress], None]
+
+
+class UploadState:
+    """Upload ids of unfinished uploads, persisted so an interrupted upload resumes where it stopped"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(printer: str, path: Path) -> str:
+        stat = path.stat()
+        return f'{printer}:{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}'
+
+    def _load(self) -> dict[str, str]:
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            return self._load().get(key)
+
+    def set(self, key: str, upload_id: str | None):
+        with self._lock:
+            state = self._load()
+            if upload_id is None:
+                state.pop(key, None)
+            else:
+                state[key] = upload_id
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(state))
+
+
+def _start(client: PrusaConnectAPI, printer: str, path: Path, storage: str,
+           state: UploadState | None, key: str) -> tuple[str, int]:
+    upload_id = state.get(key) if state else None
+    if upload_id:
+        try:
+            return upload_id, client.get_upload(upload_id)['offset']
+        except ResourceNotFound:
+            pass
+    upload = client.create_upload(printer, path.name, path.stat().st_size, storage)
+    if state:
+        state.set(key, upload['id'])
+    return upload['id'], upload.get('offset', 0)
+
+
+def upload_file(client: PrusaConnectAPI, printer: str, path: Path, storage: str = '/usb',
+                chunk_size: int = CHUNK_SIZE, state: UploadState | None = None,
+                progress: ProgressCallback | None = None) -> UploadProgress:
+    """
+    Upload `path` to a printer storage in `chunk_size` pieces read through a memory map,
+    memory use does not depend on the file size. Transport errors and 5xx are retried from the
+    offset the server acknowledged.
+    """
+    path = Path(path)
+    total = path.stat().st_size
+    key = UploadState.key(printer, path)
+    upload_id, offset = _start(client, printer, path, storage, state, key)
+    status = UploadProgress(printer, path, offset, total, time.monotonic(), resumed_from=offset)
+    if progress:
+        progress(status)
+
+    if total:
+        with path.open('rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            retries = 0
+            resync = False
+            while offset < total:
+                try:
+                    if resync:
+                        offset = client.get_upload(upload_id)['offset']
+                        resync = False
+                    else:
+                        offset = client.put_upload_chunk(upload_id, mm[offset:offset + chunk_size], offset, total)
+                        retries = 0
+                except (*TRANSPORT_ERRORS, ApiError) as e:
+                    if isinstance(e, ApiError) and e.status < 500:
+                        raise
+                    retries += 1
+                    if retries > RETRIES:
+                        raise
+                    time.sleep(2 ** retries)
+                    # the failed chunk may have partly landed, ask the server where to resume
+                    resync = True
+                    continue
+                status.sent = offset
+                if progress:
+                    progress(status)
+
+    if state:
+        state.set(key, None)
+    return status
+
+
+def upload_to_printers(client: PrusaConnectAPI, printers: list[str], path: Path, storage: str = '/usb',
+                       max_workers: int | None = None, state: UploadState | None = None,
+                       progress: ProgressCallback | None = None) -> dict[str, UploadProgress | Exception]:
+    """Upload the same file to several printers in parallel"""
+    with ThreadPoolExecutor(max_workers=max_workers or client.max_workers) as pool:
+        futures = {printer: pool.submit(upload_file, client, printer, path, storage, state=state, progress=progress)
+                   for printer in printers}
+    retval = {}
+    for printer, future in futures.items():
+        try:
+            retval[printer] = future.result()
+        except Exception as e:
+            retval[printer] = e
+    return retval
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hashlib
+import io
+from collections import OrderedDict
+
+from rich.color import Color
+from rich.style import Style
+from rich.text import Text
+from textual import work
+from textual.widgets import Static
+from textual.worker import get_current_worker
+
+from textual_prusa_connect.messages import PrinterUpdated
+from textual_prusa_connect.models import Camera, Printer
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# seconds between two snapshots
+PRINTING_FRAME_RATE = 2
+IDLE_FRAME_RATE = 30
+FRAME_CACHE_SIZE = 4
+
+
+def render_frame(data: bytes, width: int, height: int) -> Text:
+    """Downscale an image to fit `width` x `height` cells, each cell shows two pixels using a half block"""
+    image = Image.open(io.BytesIO(data))
+    # lets the JPEG decoder skip the resolution we would throw away anyway
+    image.draft('RGB', (width, height * 2))
+    image = image.convert('RGB')
+    image.thumbnail((width, height * 2))
+    pixels = image.load()
+    image_width, image_height = image.size
+    text = Text(no_wrap=True, overflow='crop')
+    for y in range(0, image_height, 2):
+        if y:
+            text.append('\n')
+        for x in range(image_width):
+            top = pixels[x, y]
+            bottom = pixels[x, y + 1] if y + 1 < image_height else top
+            text.append('▀', Style(color=Color.from_rgb(*top), bgcolor=Color.from_rgb(*bottom)))
+    return text
+
+
+class FrameCache:
+    """Last rendered frames of a camera, keyed by image digest and size"""
+
+    def __init__(self, maxsize: int = FRAME_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.frames: OrderedDict[tuple, Text] = OrderedDict()
+
+    def get(self, key: tuple) -> Text | None:
+        frame = self.frames.get(key)
+        if frame is not None:
+            self.frames.move_to_end(key)
+        return frame
+
+    def put(self, key: tuple, frame: Text):
+        self.frames[key] = frame
+        self.frames.move_to_end(key)
+        while len(self.frames) > self.maxsize:
+            self.frames.popitem(last=False)
+
+
+def frame_rate(printer: Printer) -> int:
+    return PRINTING_FRAME_RATE if printer.printer_state == 'PRINTING' else IDLE_FRAME_RATE
+
+
+class CameraView(Static):
+    DEFAULT_CSS = """
+    CameraView {
+        height: 20;
+        width: 1fr;
+        border: round lightblue;
+        border-title-color: $primary-lighten-2;
+    }
+    """
+
+    def __init__(self, client, camera: Camera, printer: Printer) -> None:
+        super().__init__('Waiting for snapshot...')
+        self.client = client
+        self.camera = camera
+        self.frame_rate = frame_rate(printer)
+        self.cache = FrameCache()
+        self.last_key = None
+        self.timer = None
+        self.showing = False
+        self.border_title = camera.name or f'Camera {camera.id}'
+        self.add_class('--requires-printer')
+
+    def on_mount(self):
+        if Image is None:
+            self.update('[red]Install Pillow to see camera snapshots')
+            return
+        # Only poll while visible, on_show starts the timer
+        self.timer = self.set_interval(self.frame_rate, self.fetch_frame, pause=not self.showing)
+
+    def on_show(self):
+        self.showing = True
+        if self.timer:
+            self.timer.resume()
+            self.fetch_frame()
+
+    def on_hide(self):
+        self.showing = False
+        if self.timer:
+            self.timer.pause()
+
+    def on_printer_updated(self, msg: PrinterUpdated):
+        new_rate = frame_rate(msg.printer)
+        if self.timer and new_rate != self.frame_rate:
+            self.frame_rate = new_rate
+            self.timer.stop()
+            self.timer = self.set_interval(self.frame_rate, self.fetch_frame, pause=not self.showing)
+
+    @work(thread=True, exclusive=True, exit_on_error=False)
+    def fetch_frame(self):
+        data = self.client.get_snapshot(self.camera.id)
+        if not data:
+            return
+        size = (self.content_size.width, self.content_size.height)
+        key = (hashlib.blake2b(data, digest_size=16).digest(), size)
+        if key == self.last_key:
+            # Nothing moved since the last snapshot, skip decoding
+            return
+        frame = self.cache.get(key)
+        if frame is None:
+            frame = render_frame(data, *size)
+            self.cache.put(key, frame)
+        if not get_current_worker().is_cancelled:
+            self.last_key = key
+            self.app.call_from_thread(self.update, frame)
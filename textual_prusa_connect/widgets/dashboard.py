@@ -1,14 +1,21 @@
 from datetime import datetime, timedelta
 from typing import Any
 
+import struct
+import zlib
+
+from textual import work
 from textual.app import ComposeResult
 from textual.containers import Container, Horizontal, Vertical, VerticalScroll
 from textual.reactive import reactive
 from textual.widget import Widget
 from textual.widgets import ProgressBar, Static, TabPane
 
+from textual_prusa_connect.bgcode import LayerIndex
+from textual_prusa_connect.connect_api import ApiError
 from textual_prusa_connect.messages import PrinterUpdated
 from textual_prusa_connect.models import File, Printer
+from textual_prusa_connect.transport import TRANSPORT_ERRORS
 from textual_prusa_connect.widgets import Pretty
 from textual_prusa_connect.widgets.file import PrintJobWidget, FileHistory
 from textual_prusa_connect.widgets.tool import ToolList
@@ -43,9 +50,21 @@ class CurrentlyPrinting(Widget):
         self.progress_bar = ProgressBar(total=100, show_eta=False)
         self.weight_progress = ProgressBar(total=self.printer.job_info.get('model_weight', 0), show_eta=False)
         self.height_progress = ProgressBar(total=self.printer.job_info.get('total_height', 0), show_eta=False)
+        self.layer_progress = ProgressBar(show_eta=False)
+        self.layer_index: LayerIndex | None = None
+
+    def on_mount(self):
+        if self.file.hash:
+            self.load_layers()
 
-    #def on_mount(self):
-    #    self.app.query_one('RichLog').write(self.file)
+    @work(thread=True, exclusive=True, exit_on_error=False)
+    def load_layers(self):
+        try:
+            self.layer_index = self.app.layer_store.get(self.printer.uuid.get_secret_value(), self.file.hash)
+        except (*TRANSPORT_ERRORS, ApiError, OSError, EOFError, ValueError, struct.error, zlib.error) as e:
+            self.app.call_from_thread(self.app.app_log.warning, 'layer index unavailable', file=self.file.name, error=e)
+            return
+        self.app.call_from_thread(self.refresh, recompose=True)
 
     def on_printer_updated(self, msg: PrinterUpdated):
         if msg.printer != self.printer:
@@ -106,6 +125,14 @@ class CurrentlyPrinting(Widget):
                                 yield self.height_progress
                                 yield Static(
                                     f' [green]{self.printer.axis_z:.2f}/{self.printer.job_info["total_height"]:.2f}[/] mm (height)')
+                            if self.layer_index:
+                                with Horizontal():
+                                    layer = self.layer_index.layer_at(self.printer.axis_z)
+                                    self.layer_progress.update(total=len(self.layer_index), progress=layer + 1)
+                                    yield self.layer_progress
+                                    layer_eta = timedelta(seconds=int(self.layer_index.remaining_time(
+                                        self.printer.axis_z, self.printer.job_info.get('time_printing'))))
+                                    yield Static(f' [green]{layer + 1}/{len(self.layer_index)}[/] layers, [green]{layer_eta}[/] left')
                         with Vertical():
                             yield Pretty(self.file.meta, 'printer_model')
                             yield Pretty(self.file.meta, 'filament_type')
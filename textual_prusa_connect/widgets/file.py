@@ -97,7 +97,7 @@ class FirmwareFileWidget(Widget):
                     yield Pretty(self.file, "m_timestamp", is_timestamp=True)
 
     def on_mount(self):
-        self.app.query_one('RichLog').write(self.file)
+        self.app.app_log.debug('firmware file', name=self.file.name, size=self.file.size)
 
 
 class FileHistory(Widget):
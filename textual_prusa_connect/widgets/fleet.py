@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any, Callable, NamedTuple
+
+from rich.text import Text
+from textual import events, work
+from textual.app import ComposeResult
+from textual.binding import Binding
+from textual.geometry import Region, Size
+from textual.message import Message
+from textual.screen import Screen
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+from textual.widgets import Footer, Input, Static
+
+from textual_prusa_connect.models import Printer
+
+FLEET_REFRESH = 10
+
+STATE_COLORS = {'PRINTING': 'green', 'READY': 'blue', 'IDLE': 'white', 'FINISHED': 'cyan',
+                'PAUSED': 'yellow', 'ATTENTION': 'bold red', 'ERROR': 'bold red', 'OFFLINE': 'dim'}
+
+
+class PrinterRow(NamedTuple):
+    name: str
+    state: str
+    temp_nozzle: float | None
+    target_nozzle: float | None
+    temp_bed: float | None
+    target_bed: float | None
+    progress: float | None
+    time_remaining: int | None
+    material: str | None
+
+    @classmethod
+    def from_printer(cls, printer: Printer) -> PrinterRow:
+        temp = printer.temp or {}
+        job_info = printer.job_info or {}
+        return cls(printer.name, printer.printer_state,
+                   temp.get('temp_nozzle'), temp.get('target_nozzle'),
+                   temp.get('temp_bed'), temp.get('target_bed'),
+                   job_info.get('progress'), job_info.get('time_remaining'),
+                   (printer.filament or {}).get('material'))
+
+
+def _temp(value, target) -> str:
+    if value is None:
+        return '-'
+    return f'{value:.0f}/{target:.0f}°' if target else f'{value:.0f}°'
+
+
+def _eta(seconds) -> str:
+    return str(timedelta(seconds=seconds)) if seconds not in (None, -1) else '-'
+
+
+class Column(NamedTuple):
+    title: str
+    width: int
+    render: Callable[[PrinterRow], str]
+    sort_key: Callable[[PrinterRow], Any]
+
+
+COLUMNS = [
+    Column('Printer', 24, lambda row: row.name, lambda row: row.name.lower()),
+    Column('State', 11, lambda row: row.state, lambda row: row.state),
+    Column('Nozzle', 10, lambda row: _temp(row.temp_nozzle, row.target_nozzle), lambda row: row.temp_nozzle or 0),
+    Column('Bed', 9, lambda row: _temp(row.temp_bed, row.target_bed), lambda row: row.temp_bed or 0),
+    Column('Progress', 9, lambda row: f'{row.progress:.0f}%' if row.progress is not None else '-',
+           lambda row: row.progress or 0),
+    Column('ETA', 10, lambda row: _eta(row.time_remaining),
+           lambda row: row.time_remaining if row.time_remaining not in (None, -1) else float('inf')),
+    Column('Material', 10, lambda row: row.material or '-', lambda row: row.material or ''),
+]
+
+
+def _cells(cells: list[str]) -> str:
+    return ' '.join(cell[:column.width].ljust(column.width) for cell, column in zip(cells, COLUMNS))
+
+
+class FleetTable(ScrollView, can_focus=True):
+    """
+    One line per printer, only visible lines are rendered. Poll results update rows in
+    place, sorting and filtering only reorder the list of printer ids.
+    """
+
+    COMPONENT_CLASSES = {'fleet-table--cursor'}
+    DEFAULT_CSS = """
+    FleetTable {
+        height: 1fr;
+    }
+    FleetTable > .fleet-table--cursor {
+        background: $accent;
+    }
+    """
+    BINDINGS = [
+        Binding('up', 'cursor(-1)', 'Up', show=False),
+        Binding('down', 'cursor(1)', 'Down', show=False),
+        Binding('enter', 'select', 'Open dashboard'),
+    ]
+
+    class Selected(Message):
+        def __init__(self, printer_id: str) -> None:
+            super().__init__()
+            self.printer_id = printer_id
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.rows: dict[str, PrinterRow] = {}
+        self.order: list[str] = []
+        self.positions: dict[str, int] = {}
+        self.sort_column = 0
+        self.sort_reverse = False
+        self.filter_text = ''
+        self.cursor = 0
+        self._strips: dict[str, Strip] = {}
+
+    @property
+    def header(self) -> str:
+        titles = [column.title + (' ▼' if self.sort_reverse else ' ▲') * (i == self.sort_column)
+                  for i, column in enumerate(COLUMNS)]
+        return _cells(titles)
+
+    def update_printers(self, printers: list[Printer]):
+        """`printers` is the whole fleet, rows of printers missing from it are dropped"""
+        dirty = []
+        sort_key = COLUMNS[self.sort_column].sort_key
+        seen = {printer.uuid.get_secret_value() for printer in printers}
+        removed = [printer_id for printer_id in self.rows if printer_id not in seen]
+        for printer_id in removed:
+            del self.rows[printer_id]
+            self._strips.pop(printer_id, None)
+        resort = bool(removed)
+        for printer in printers:
+            printer_id = printer.uuid.get_secret_value()
+            row = PrinterRow.from_printer(printer)
+            old = self.rows.get(printer_id)
+            if old == row:
+                continue
+            self.rows[printer_id] = row
+            self._strips.pop(printer_id, None)
+            if old is None or sort_key(old) != sort_key(row) or self.matches(old) != self.matches(row):
+                resort = True
+            else:
+                dirty.append(printer_id)
+        if resort:
+            self.reorder()
+        else:
+            for printer_id in dirty:
+                self.refresh_row(printer_id)
+
+    def matches(self, row: PrinterRow) -> bool:
+        if not self.filter_text:
+            return True
+        text = self.filter_text.lower()
+        return any(text in str(value).lower() for value in (row.name, row.state, row.material))
+
+    def reorder(self):
+        selected = self.selected
+        sort_key = COLUMNS[self.sort_column].sort_key
+        self.order = sorted((printer_id for printer_id, row in self.rows.items() if self.matches(row)),
+                            key=lambda printer_id: sort_key(self.rows[printer_id]), reverse=self.sort_reverse)
+        self.positions = {printer_id: i for i, printer_id in enumerate(self.order)}
+        self.cursor = self.positions.get(selected, min(self.cursor, max(len(self.order) - 1, 0)))
+        self.virtual_size = Size(sum(column.width + 1 for column in COLUMNS), len(self.order))
+        self.refresh()
+
+    def sort_by(self, column: int):
+        if column == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = column, False
+        self.reorder()
+
+    def filter(self, text: str):
+        self.filter_text = text
+        self.reorder()
+
+    @property
+    def selected(self) -> str | None:
+        return self.order[self.cursor] if 0 <= self.cursor < len(self.order) else None
+
+    def refresh_row(self, printer_id: str):
+        index = self.positions.get(printer_id)
+        if index is None:
+            return
+        y = index - self.scroll_offset.y
+        if 0 <= y < self.size.height:
+            self.refresh(Region(0, y, self.size.width, 1))
+
+    def render_row(self, printer_id: str) -> Strip:
+        strip = self._strips.get(printer_id)
+        if strip is None:
+            row = self.rows[printer_id]
+            text = Text(_cells([column.render(row) for column in COLUMNS]), no_wrap=True)
+            state_start = COLUMNS[0].width + 1
+            text.stylize(STATE_COLORS.get(row.state, ''), state_start, state_start + COLUMNS[1].width)
+            strip = Strip(text.render(self.app.console), text.cell_len)
+            self._strips[printer_id] = strip
+        return strip
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        index = scroll_y + y
+        width = self.size.width
+        if index >= len(self.order):
+            return Strip.blank(width, self.rich_style)
+        strip = self.render_row(self.order[index])
+        if index == self.cursor:
+            strip = strip.apply_style(self.get_component_rich_style('fleet-table--cursor'))
+        return strip.crop_extend(scroll_x, scroll_x + width, self.rich_style)
+
+    def move_cursor(self, index: int):
+        if not self.order:
+            return
+        previous = self.selected
+        self.cursor = max(0, min(index, len(self.order) - 1))
+        if previous:
+            self.refresh_row(previous)
+        self.refresh_row(self.selected)
+        self.scroll_to_region(Region(0, self.cursor, 1, 1), animate=False, force=True)
+
+    def action_cursor(self, delta: int):
+        self.move_cursor(self.cursor + delta)
+
+    def action_select(self):
+        if self.selected:
+            self.post_message(self.Selected(self.selected))
+
+    def on_click(self, event: events.Click):
+        index = self.scroll_offset.y + event.y
+        if index == self.cursor:
+            # second click on the same row opens it
+            self.action_select()
+        else:
+            self.move_cursor(index)
+
+
+class FleetScreen(Screen):
+    DEFAULT_CSS = """
+    FleetScreen {
+        #fleet-header {
+            background: $background-lighten-2;
+            color: $primary-lighten-2;
+            text-style: bold;
+        }
+        Input {
+            dock: top;
+        }
+    }
+    """
+    BINDINGS = [
+        ('escape', 'app.pop_screen', 'Back'),
+        ('slash', 'focus_filter', 'Filter'),
+        ('o', 'sort_next', 'Sort column'),
+        ('r', 'sort_reverse', 'Reverse sort'),
+    ]
+
+    def __init__(self, client) -> None:
+        super().__init__()
+        self.client = client
+
+    def compose(self) -> ComposeResult:
+        yield Input(placeholder='Filter by name, state or material')
+        yield Static(id='fleet-header')
+        yield FleetTable()
+        yield Footer()
+
+    def on_mount(self):
+        self.update_header()
+        self.query_one(FleetTable).focus()
+        self.set_interval(FLEET_REFRESH, self.poll)
+        self.poll()
+
+    @work(thread=True, exclusive=True, exit_on_error=False)
+    def poll(self):
+        printers = self.client.get_printers()
+        if printers is not None:
+            self.app.call_from_thread(self.query_one(FleetTable).update_printers, printers)
+
+    def update_header(self):
+        self.query_one('#fleet-header', Static).update(self.query_one(FleetTable).header)
+
+    def on_input_changed(self, event: Input.Changed):
+        self.query_one(FleetTable).filter(event.value)
+
+    def on_input_submitted(self):
+        self.query_one(FleetTable).focus()
+
+    def action_focus_filter(self):
+        self.query_one(Input).focus()
+
+    def action_sort_next(self):
+        table = self.query_one(FleetTable)
+        table.sort_by((table.sort_column + 1) % len(COLUMNS))
+        self.update_header()
+
+    def action_sort_reverse(self):
+        table = self.query_one(FleetTable)
+        table.sort_by(table.sort_column)
+        self.update_header()
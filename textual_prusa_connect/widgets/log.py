@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from rich.text import Text
+from textual.cache import LRUCache
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+from textual_prusa_connect.app_log import AppLog, LogRecord
+
+LEVEL_STYLES = {'debug': 'dim', 'info': 'blue', 'warning': 'yellow', 'error': 'bold red'}
+
+
+class LogView(ScrollView, can_focus=True):
+    """Renders the visible window of an `AppLog`, nothing else is ever turned into segments"""
+
+    DEFAULT_CSS = """
+    LogView {
+        height: 1fr;
+    }
+    """
+
+    def __init__(self, app_log: AppLog, refresh_interval: float = 0.25, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.app_log = app_log
+        self.refresh_interval = refresh_interval
+        self._last_seq = -2
+        self._strips: LRUCache[int, Strip] = LRUCache(1024)
+        self._width = 0
+
+    def on_mount(self):
+        # Records can be logged from worker threads, poll the buffer instead of reacting to each record
+        self.set_interval(self.refresh_interval, self.sync)
+        self.sync()
+
+    def sync(self):
+        last_seq = self.app_log.last_seq
+        if last_seq == self._last_seq:
+            return
+        follow = self.is_vertical_scroll_end
+        self._last_seq = last_seq
+        self.virtual_size = Size(self._width, len(self.app_log.records))
+        if follow:
+            self.scroll_end(animate=False)
+        self.refresh()
+
+    def render_record(self, record: LogRecord) -> Strip:
+        strip = self._strips.get(record.seq)
+        if strip is None:
+            text = Text.assemble(
+                (datetime.fromtimestamp(record.time).strftime('%H:%M:%S '), 'dim'),
+                (f'{record.level.upper():<8}', LEVEL_STYLES[record.level]),
+                record.message,
+                no_wrap=True,
+            )
+            if record.fields:
+                text.append(' ' + ' '.join(f'{k}={v}' for k, v in record.fields.items()), 'dim')
+            strip = Strip(text.render(self.app.console), text.cell_len)
+            self._strips[record.seq] = strip
+            if strip.cell_length > self._width:
+                self._width = strip.cell_length
+        return strip
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        index = scroll_y + y
+        width = self.size.width
+        records = self.app_log.records
+        if index >= len(records):
+            return Strip.blank(width, self.rich_style)
+        strip = self.render_record(records[index])
+        return strip.crop_extend(scroll_x, scroll_x + width, self.rich_style)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import math
+import time
+from array import array
+from bisect import bisect_left
+
+from textual.app import ComposeResult
+from textual.containers import Horizontal
+from textual.widgets import Label, Sparkline, Static, TabPane
+
+from textual_prusa_connect.messages import PrinterUpdated
+from textual_prusa_connect.models import Printer
+from textual_prusa_connect.telemetry import METRICS, TelemetryArchive, downsample
+
+# seconds of history shown, cycled with `w`
+WINDOWS = [3600, 6 * 3600, 86400, 7 * 86400]
+LABEL_WIDTH = 28
+
+
+class TelemetryPane(TabPane, can_focus=True):
+    DEFAULT_CSS = """
+    TelemetryPane {
+        Horizontal {
+            height: 1;
+        }
+        Label {
+            width: 28;
+        }
+        Sparkline {
+            width: 1fr;
+        }
+    }
+    """
+    BINDINGS = [('w', 'next_window', 'History window')]
+
+    def __init__(self, archive: TelemetryArchive, printer: Printer) -> None:
+        super().__init__(title='Telemetry')
+        self.add_class('--requires-printer')
+        self.archive = archive
+        self.printer_id = printer.uuid.get_secret_value()
+        self.window = 0
+
+    def compose(self) -> ComposeResult:
+        yield Static(id='telemetry-window')
+        for metric in METRICS:
+            with Horizontal():
+                yield Label(metric, id=f'label-{metric}')
+                yield Sparkline([], id=f'spark-{metric}')
+
+    def on_show(self):
+        self.load()
+
+    def on_printer_updated(self, msg: PrinterUpdated):
+        if self.display:
+            self.load()
+
+    def action_next_window(self):
+        self.window = (self.window + 1) % len(WINDOWS)
+        self.load()
+
+    def load(self):
+        end = int(time.time())
+        start = end - WINDOWS[self.window]
+        width = max(self.size.width - LABEL_WIDTH, 10)
+        # samples still buffered in memory are newer than anything on disk
+        pending = self.archive.pending(self.printer_id)
+        pending = pending[bisect_left([timestamp for timestamp, _ in pending], start):]
+        with self.archive.open(self.printer_id) as reader:
+            lo, hi = reader.range(start, end)
+            self.query_one('#telemetry-window', Static).update(
+                f'Last {WINDOWS[self.window] // 3600}h, {hi - lo + len(pending)} samples')
+            for i, metric in enumerate(METRICS):
+                values = array('d')
+                with reader.column(metric)[lo:hi] as stored:
+                    values.frombytes(stored.cast('B'))
+                values.extend(sample[i] for _, sample in pending)
+                known = [v for v in values[-1:] if not math.isnan(v)]
+                last = f'{known[0]:.1f}' if known else '-'
+                self.query_one(f'#label-{metric}', Label).update(f'{metric:<16}{last:>10}')
+                self.query_one(f'#spark-{metric}', Sparkline).data = downsample(values, width)
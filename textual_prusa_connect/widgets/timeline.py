@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime
+
+from rich.text import Text
+from textual.reactive import reactive
+from textual.widget import Widget
+
+from textual_prusa_connect.timeline import ZOOM_LEVELS, PrinterTimeline
+
+SHADES = ' ░▒▓█'
+LABEL_WIDTH = 20
+STATS_WIDTH = 40
+
+
+class TimelineView(Widget, can_focus=True):
+    """Gantt like utilization of each printer, one cell per bucket of the current zoom level"""
+
+    DEFAULT_CSS = """
+    TimelineView {
+        height: auto;
+        border: round lightblue;
+        border-title-color: black;
+        border-title-background: lightblue;
+        background: $background-lighten-2;
+    }
+    """
+    BINDINGS = [
+        ('plus', 'zoom(-1)', 'Zoom in'),
+        ('minus', 'zoom(1)', 'Zoom out'),
+        ('left', 'pan(-1)', 'Earlier'),
+        ('right', 'pan(1)', 'Later'),
+    ]
+
+    zoom = reactive(2)
+    pan = reactive(0)
+
+    def __init__(self, timelines: dict[str, PrinterTimeline], names: dict[str, str] | None = None,
+                 maintenance_windows: list[tuple[int, int]] | None = None) -> None:
+        super().__init__()
+        self.timelines = timelines
+        self.names = names or {}
+        self.maintenance_windows = maintenance_windows or []
+        self.border_title = 'Utilization'
+
+    def action_zoom(self, delta: int):
+        self.zoom = max(0, min(self.zoom + delta, len(ZOOM_LEVELS) - 1))
+
+    def action_pan(self, delta: int):
+        self.pan = min(self.pan + delta, 0)
+
+    def get_content_height(self, container, viewport, width: int) -> int:
+        return len(self.timelines) + 2
+
+    def render(self) -> Text:
+        level = ZOOM_LEVELS[self.zoom]
+        columns = max(self.size.width - LABEL_WIDTH - STATS_WIDTH, 10)
+        now = int(time.time())
+        # pan by half a screen
+        last_bucket = now // level + self.pan * (columns // 2)
+        lo = (last_bucket - columns + 1) * level
+        hi = (last_bucket + 1) * level
+        windows = [(max(start, lo), min(end, hi)) for start, end in self.maintenance_windows if end > lo and start < hi]
+
+        text = Text(no_wrap=True, overflow='crop')
+        text.append(f'{"":<{LABEL_WIDTH}}{datetime.fromtimestamp(lo):%Y-%m-%d %H:%M}', 'dim')
+        text.append(f' → {datetime.fromtimestamp(hi):%Y-%m-%d %H:%M}, one cell = {level // 3600}h\n', 'dim')
+        for printer, timeline in self.timelines.items():
+            name = self.names.get(printer, printer[:8])
+            text.append(f'{name[:LABEL_WIDTH - 1]:<{LABEL_WIDTH}}', 'yellow')
+            for bucket_start, usage in zip(range(lo, hi, level), timeline.buckets(level, lo, columns)):
+                in_maintenance = any(start < bucket_start + level and end > bucket_start for start, end in windows)
+                shade = SHADES[min(int(usage * (len(SHADES) - 1) + 0.999), len(SHADES) - 1)]
+                text.append(shade, 'red' if in_maintenance and usage else 'blue')
+            gaps = timeline.idle_gaps(lo, hi)
+            text.append(f' {timeline.utilization(lo, hi):6.1%}', 'green')
+            text.append(f' {len(timeline.jobs_between(lo, hi)):4} jobs {len(gaps):4} gaps')
+            overlap = timeline.maintenance_overlap(windows)
+            text.append(f' {overlap // 3600:3}h maint\n' if overlap else '\n', 'red')
+        return text
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from textual import work
+from textual.app import ComposeResult
+from textual.containers import Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Input, ProgressBar, Static
+
+from textual_prusa_connect.connect_api import ApiError
+from textual_prusa_connect.models import Printer
+from textual_prusa_connect.transport import TRANSPORT_ERRORS
+from textual_prusa_connect.upload import UploadProgress, UploadState, upload_file
+
+
+class UploadScreen(ModalScreen):
+    DEFAULT_CSS = """
+    UploadScreen {
+        align: center middle;
+        Vertical {
+            width: 80;
+            height: auto;
+            border: round lightblue;
+            border-title-color: $primary-lighten-2;
+            background: $background-lighten-2;
+            padding: 1;
+        }
+        ProgressBar {
+            padding-top: 1;
+        }
+    }
+    """
+    BINDINGS = [('escape', 'dismiss', 'Close')]
+
+    def __init__(self, client, printer: Printer, state: UploadState) -> None:
+        super().__init__()
+        self.client = client
+        self.printer = printer
+        self.state = state
+
+    def compose(self) -> ComposeResult:
+        with Vertical() as dialog:
+            dialog.border_title = f'Upload to {self.printer.name}'
+            yield Input(placeholder='Path to a .bgcode file')
+            yield ProgressBar(total=None, show_eta=True)
+            yield Static(' ', id='upload-status')
+
+    def on_input_submitted(self, event: Input.Submitted):
+        path = Path(event.value).expanduser()
+        if not path.is_file():
+            self.notify(f'{path} is not a file', severity='error')
+            return
+        event.input.disabled = True
+        self.upload(path)
+
+    @work(thread=True, exclusive=True, exit_on_error=False)
+    def upload(self, path: Path):
+        printer_id = self.printer.uuid.get_secret_value()
+        storages = self.client.get_storage(printer_id)
+        storage = storages[0].get('path', '/usb') if storages else '/usb'
+        try:
+            upload_file(self.client, printer_id, path, storage, state=self.state,
+                        progress=lambda progress: self.app.call_from_thread(self.show_progress, progress))
+        except (*TRANSPORT_ERRORS, ApiError, OSError) as e:
+            self.app.call_from_thread(self.app.app_log.error, 'upload failed', file=path.name, error=e)
+            self.app.call_from_thread(self.notify, f'Upload failed: {e}', severity='error')
+            return
+        self.app.call_from_thread(self.app.app_log.info, 'upload done', file=path.name, storage=storage)
+        self.app.call_from_thread(self.notify, f'{path.name} uploaded to {storage}')
+
+    def show_progress(self, progress: UploadProgress):
+        self.query_one(ProgressBar).update(total=progress.total, progress=progress.sent)
+        self.query_one('#upload-status', Static).update(
+            f'[blue]{progress.sent / 1e6:.1f}/{progress.total / 1e6:.1f}[/] MB '
+            f'at [green]{progress.throughput / 1e6:.2f}[/] MB/s'
+            + (f' (resumed at {progress.resumed_from / 1e6:.1f} MB)' if progress.resumed_from else ''))